@@ -0,0 +1,110 @@
+# benchmarks/classifier.py
+"""
+Accuracy and latency of the thumbnail document-type classifier
+(services/classifier.py) used by documentType=auto.
+
+Runs on synthetic PAN cards, passports and driving licences plus the
+images/ samples. Driving licences are not a registered type, so the
+expected prediction for them (and for the images/ samples, a licence photo
+and UI screenshots) is "unknown": the pipeline then falls back to
+classifying OCR text. Prints a confusion matrix and per-step latency:
+
+    python benchmarks/classifier.py --synthetic 20
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthetic_cards import real_samples, synthetic_samples, Sample  # noqa: E402
+from pipeline import summarize  # noqa: E402
+from services.classifier import classify_features, load_thumbnail, thumbnail_features  # noqa: E402
+from services.pipeline import DOCUMENT_TYPES  # noqa: E402
+
+UNKNOWN = "unknown"
+
+
+def expected_label(sample: Sample) -> str:
+    return sample.document_type if sample.document_type in DOCUMENT_TYPES else UNKNOWN
+
+
+def run_benchmark(samples: List[Sample], runs: int) -> dict:
+    confusion: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    timings: Dict[str, List[float]] = defaultdict(list)
+    misclassified = []
+
+    # Untimed pass: imports and allocator warm-up
+    for sample in samples:
+        classify_features(thumbnail_features(load_thumbnail(sample.image_bytes)), DOCUMENT_TYPES.values())
+
+    for run in range(runs):
+        for sample in samples:
+            started = time.perf_counter()
+            thumbnail = load_thumbnail(sample.image_bytes)
+            decoded = time.perf_counter()
+            features = thumbnail_features(thumbnail)
+            extracted = time.perf_counter()
+            classification = classify_features(features, DOCUMENT_TYPES.values())
+            finished = time.perf_counter()
+
+            timings["thumbnail"].append(decoded - started)
+            timings["features"].append(extracted - decoded)
+            timings["classify"].append(finished - extracted)
+            timings["total"].append(finished - started)
+
+            if run == 0:
+                predicted = classification.document_type if classification else UNKNOWN
+                expected = expected_label(sample)
+                confusion[expected][predicted] += 1
+                if predicted != expected:
+                    misclassified.append({"sample": sample.name, "expected": expected, "predicted": predicted,
+                                          "features": vars(features)})
+
+    total = sum(sum(row.values()) for row in confusion.values())
+    correct = sum(confusion[label][label] for label in confusion)
+    return {
+        "documents": len(samples),
+        "runs": runs,
+        "accuracy": round(correct / total, 4) if total else None,
+        "confusion": {expected: dict(row) for expected, row in confusion.items()},
+        "latency": {step: summarize(values) for step, values in timings.items()},
+        "misclassified": misclassified,
+    }
+
+
+def print_confusion(confusion: Dict[str, Dict[str, int]]):
+    labels = sorted(set(confusion) | {label for row in confusion.values() for label in row})
+    print("\n" + f"{'expected/predicted':<22}" + "".join(f"{label:>12}" for label in labels))
+    for expected in labels:
+        row = confusion.get(expected, {})
+        print(f"{expected:<22}" + "".join(f"{row.get(label, 0):>12}" for label in labels))
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="timed passes over the corpus")
+    parser.add_argument("--synthetic", type=int, default=10, help="synthetic documents per type")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-real", action="store_true", help="leave out the images/ samples")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    samples = synthetic_samples(args.synthetic, args.seed)
+    if not args.no_real:
+        samples += real_samples()
+
+    results = run_benchmark(samples, args.runs)
+    print(json.dumps(results, indent=2))
+    print_confusion(results["confusion"])
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,95 @@
+# benchmarks/field_extraction.py
+"""
+Microbenchmark for the single-pass field extractor on a large synthetic
+OCR corpus (PAN cards and passports mixed with noisy OCR lines).
+
+    python benchmarks/field_extraction.py [--documents 20000] [--noise-lines 30]
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.field_extraction import extract_fields  # noqa: E402
+
+FIRST_NAMES = ["RAHUL", "PRIYA", "AMIT", "SUNITA", "VIKRAM", "ANJALI", "ROHAN", "NEHA"]
+LAST_NAMES = ["SHARMA", "KUMAR", "VERMA", "SINGH", "PATEL", "GUPTA", "REDDY", "IYER"]
+
+
+def noise_line(rng: random.Random) -> str:
+    length = rng.randint(5, 60)
+    return "".join(rng.choice(string.ascii_letters + string.digits + " .,;|") for _ in range(length))
+
+
+def random_date(rng: random.Random) -> str:
+    return f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(1950, 2030)}"
+
+
+def pan_text(rng: random.Random, noise_lines: int) -> str:
+    number = "".join(rng.choices(string.ascii_uppercase, k=5)) + f"{rng.randint(0, 9999):04d}" + rng.choice(string.ascii_uppercase)
+    lines = [
+        "INCOME TAX DEPARTMENT GOVT. OF INDIA",
+        "Permanent Account Number Card",
+        number,
+        "नाम / Name",
+        f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "पिता का नाम / Father's Name",
+        f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "जन्म की तारीख / Date of Birth",
+        random_date(rng),
+    ]
+    lines += [noise_line(rng) for _ in range(noise_lines)]
+    return "\n".join(lines)
+
+
+def passport_text(rng: random.Random, noise_lines: int) -> str:
+    lines = [
+        "REPUBLIC OF INDIA",
+        f"Passport No. {rng.choice(string.ascii_uppercase)}{rng.randint(0, 99999999):08d}",
+        f"Surname: {rng.choice(LAST_NAMES)}",
+        f"Given Names: {rng.choice(FIRST_NAMES)}",
+        f"Date of Birth {random_date(rng)}",
+        f"Date of Issue {random_date(rng)}",
+        f"Date of Expiry {random_date(rng)}",
+    ]
+    lines += [noise_line(rng) for _ in range(noise_lines)]
+    rng.shuffle(lines[7:])
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--noise-lines", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = []
+    for i in range(args.documents):
+        if i % 2:
+            corpus.append(("passport", passport_text(rng, args.noise_lines)))
+        else:
+            corpus.append(("pan_card", pan_text(rng, args.noise_lines)))
+    total_bytes = sum(len(text.encode()) for _, text in corpus)
+
+    start = time.perf_counter()
+    found = 0
+    for document_type, text in corpus:
+        found += bool(extract_fields(text, document_type).get("documentNumber"))
+    elapsed = time.perf_counter() - start
+
+    print(f"documents:      {args.documents}")
+    print(f"corpus size:    {total_bytes / 1e6:.1f} MB")
+    print(f"elapsed:        {elapsed:.3f} s")
+    print(f"throughput:     {args.documents / elapsed:,.0f} docs/s, {total_bytes / 1e6 / elapsed:.1f} MB/s")
+    print(f"per document:   {elapsed / args.documents * 1e6:.1f} us")
+    print(f"numbers found:  {found}/{args.documents}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+# benchmarks/pipeline.py
+"""
+End-to-end offline benchmark of the OCR pipeline.
+
+The corpus is the images/ samples plus synthetic PAN cards, passports and
+driving licences with known field values (see synthetic_cards.py). Every
+document goes through the stages of services/pipeline.py (decode,
+preprocess, MRZ/OCR, extract) and, for comparison, the OpenCV
+process_document_image. Reports throughput, p50/p95/p99 latency per stage, peak RSS and
+field-level accuracy, and can write/compare JSON results between commits:
+
+    python benchmarks/pipeline.py --output before.json
+    python benchmarks/pipeline.py --compare before.json --max-regression 0.1
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthetic_cards import real_samples, synthetic_samples, Sample  # noqa: E402
+from services.ocr_engine import get_engine  # noqa: E402
+from services.pipeline import DOCUMENT_TYPES, PREPROCESSORS, decode_image, run_stages  # noqa: E402
+from utils.image_processing import DEFAULT_PROFILE, process_document_image  # noqa: E402
+from utils.timing import StageTimer  # noqa: E402
+
+logging.basicConfig(level=logging.WARNING)
+
+# Unregistered sample types (driving licences) are timed as PAN cards, not scored
+FALLBACK_TYPE = 'pan_card'
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def summarize(samples: List[float]) -> dict:
+    return {
+        "count": len(samples),
+        "meanMs": round(sum(samples) / len(samples) * 1000, 3),
+        "p50Ms": round(percentile(samples, 50) * 1000, 3),
+        "p95Ms": round(percentile(samples, 95) * 1000, 3),
+        "p99Ms": round(percentile(samples, 99) * 1000, 3),
+    }
+
+
+def normalize(value) -> str:
+    return " ".join(str(value or "").upper().split())
+
+
+def run_sample(sample: Sample, ocr: bool) -> dict:
+    document_type = DOCUMENT_TYPES.get(sample.document_type, DOCUMENT_TYPES[FALLBACK_TYPE])
+    if ocr:
+        fields, _, _, timer = run_stages(sample.image_bytes, document_type)
+    else:
+        timer = StageTimer()
+        max_dimension, preprocess = PREPROCESSORS[document_type.preprocess]
+        with timer.stage("decode"):
+            image = decode_image(sample.image_bytes, max_dimension)
+        with timer.stage("preprocess"):
+            preprocess(image)
+        fields = None
+
+    with timer.stage("opencv_preprocess"):
+        process_document_image(sample.image_bytes)
+
+    if sample.document_type not in DOCUMENT_TYPES:
+        fields = None
+    elif fields is not None:
+        # Dates are scored on their ISO form
+        fields = {name: getattr(value, "iso", value) for name, value in fields.items()}
+    return {"stages": timer.stages, "fields": fields}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(__file__), stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(samples: List[Sample], runs: int, ocr: bool) -> dict:
+    engine = get_engine() if ocr else None
+
+    # One untimed pass: imports, model loading and allocator warm-up
+    for sample in samples:
+        run_sample(sample, ocr)
+
+    stage_samples: Dict[str, List[float]] = defaultdict(list)
+    totals: List[float] = []
+    correct: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    expected: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    started = time.perf_counter()
+    for _ in range(runs):
+        for sample in samples:
+            document_start = time.perf_counter()
+            outcome = run_sample(sample, ocr)
+            totals.append(time.perf_counter() - document_start)
+            for stage, seconds in outcome["stages"].items():
+                stage_samples[stage].append(seconds)
+
+            if sample.truth is None or outcome["fields"] is None:
+                continue
+            for name, value in sample.truth.items():
+                expected[sample.document_type][name] += 1
+                if normalize(outcome["fields"].get(name)) == normalize(value):
+                    correct[sample.document_type][name] += 1
+    elapsed = time.perf_counter() - started
+
+    accuracy = {
+        document_type: {name: round(correct[document_type][name] / count, 4) for name, count in fields.items()}
+        for document_type, fields in expected.items()
+    }
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "ocrBackend": engine.name if engine else None,
+            "preprocessProfile": DEFAULT_PROFILE,
+            "documents": len(samples),
+            "runs": runs,
+        },
+        "throughputDocsPerSec": round(len(totals) / elapsed, 3),
+        "latency": {"total": summarize(totals), **{stage: summarize(values) for stage, values in stage_samples.items()}},
+        # ru_maxrss is in KiB on Linux; children covers the tesseract binary
+        "peakRssMb": {
+            "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+        },
+        "accuracy": accuracy,
+    }
+
+
+def compare(current: dict, baseline: dict, max_regression: float) -> List[str]:
+    """Print latency and accuracy deltas; returns the regressions found."""
+    regressions = []
+    print(f"\n{'stage':<20}{'p50 ms':>24}{'p95 ms':>24}")
+    for stage, stats in current["latency"].items():
+        before = baseline["latency"].get(stage)
+        if before is None:
+            continue
+        cells = []
+        for key in ("p50Ms", "p95Ms"):
+            change = (stats[key] - before[key]) / before[key] if before[key] else 0.0
+            cells.append(f"{before[key]:.1f}->{stats[key]:.1f} ({change:+.0%})")
+            if key == "p50Ms" and change > max_regression:
+                regressions.append(f"{stage} p50 {change:+.0%}")
+        print(f"{stage:<20}{cells[0]:>24}{cells[1]:>24}")
+
+    print(f"\n{'field':<30}{'accuracy':>18}")
+    for document_type, fields in current["accuracy"].items():
+        for name, value in fields.items():
+            before = baseline["accuracy"].get(document_type, {}).get(name)
+            if before is None:
+                continue
+            print(f"{document_type + '.' + name:<30}{f'{before:.3f}->{value:.3f}':>18}")
+            if value < before:
+                regressions.append(f"{document_type}.{name} accuracy {before:.3f}->{value:.3f}")
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="timed passes over the corpus")
+    parser.add_argument("--synthetic", type=int, default=5, help="synthetic documents per type")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-ocr", action="store_true", help="skip OCR (and MRZ), time preprocessing only")
+    parser.add_argument("--no-real", action="store_true", help="leave out the images/ samples")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.1,
+                        help="fail when a stage's p50 grows by more than this fraction or accuracy drops")
+    args = parser.parse_args()
+
+    samples = synthetic_samples(args.synthetic, args.seed)
+    if not args.no_real:
+        samples += real_samples()
+
+    results = run_benchmark(samples, args.runs, ocr=not args.no_ocr)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.max_regression)
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
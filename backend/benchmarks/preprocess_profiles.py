@@ -0,0 +1,89 @@
+# benchmarks/preprocess_profiles.py
+"""
+Compare preprocessing profiles on the sample images.
+
+For every image in images/ and every profile this reports the median
+preprocessing time, the OCR time and how close the OCR text is to the
+text produced by the 'quality' profile (1.0 = identical). --stages adds, per
+image and profile, the time and newly allocated bytes of each OpenCV stage
+(second run, so the worker's scratch buffers are already there).
+
+    python benchmarks/preprocess_profiles.py [--runs 5] [--no-ocr] [--stages]
+"""
+import argparse
+import difflib
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from utils.image_processing import (  # noqa: E402
+    PREPROCESS_PROFILES, PreprocessStats, preprocess_image, process_document_image
+)
+
+IMAGES_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "images")
+
+
+def timed(fn, runs):
+    samples = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return result, statistics.median(samples) * 1000
+
+
+def print_stages(filename: str, image_bytes: bytes):
+    for name in PREPROCESS_PROFILES:
+        preprocess_image(image_bytes, name)
+        stats = PreprocessStats()
+        preprocess_image(image_bytes, name, stats)
+        stages = "  ".join(
+            f"{stage} {seconds * 1000:.1f}ms/{stats.allocated[stage] // 1024}KiB"
+            for stage, seconds in stats.seconds.items()
+        )
+        print(f"  {filename:<14}{name:<10}strips {stats.strips}  {stages}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--images", default=IMAGES_DIR)
+    parser.add_argument("--no-ocr", action="store_true", help="only time preprocessing")
+    parser.add_argument("--stages", action="store_true", help="per-stage time and allocations")
+    args = parser.parse_args()
+
+    engine = None
+    if not args.no_ocr:
+        from services.ocr_engine import get_engine
+        engine = get_engine()
+
+    print(f"{'image':<14}{'profile':<10}{'size':>12}{'prep ms':>10}{'ocr ms':>10}{'similarity':>12}")
+    for filename in sorted(os.listdir(args.images)):
+        with open(os.path.join(args.images, filename), "rb") as f:
+            image_bytes = f.read()
+
+        texts = {}
+        rows = []
+        for name in PREPROCESS_PROFILES:
+            image, prep_ms = timed(lambda: process_document_image(image_bytes, name), args.runs)
+            ocr_ms = 0.0
+            if engine is not None:
+                texts[name], ocr_ms = timed(lambda: engine.image_to_string(image), 1)
+            rows.append((name, image.size, prep_ms, ocr_ms))
+
+        for name, size, prep_ms, ocr_ms in rows:
+            similarity = ""
+            if engine is not None:
+                ratio = difflib.SequenceMatcher(None, texts["quality"], texts[name]).ratio()
+                similarity = f"{ratio:.3f}"
+            print(f"{filename:<14}{name:<10}{f'{size[0]}x{size[1]}':>12}{prep_ms:>10.1f}{ocr_ms:>10.1f}{similarity:>12}")
+        if args.stages:
+            print_stages(filename, image_bytes)
+
+
+if __name__ == "__main__":
+    main()
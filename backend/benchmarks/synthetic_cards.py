@@ -0,0 +1,182 @@
+# benchmarks/synthetic_cards.py
+"""
+Synthetic PAN cards, passport data pages and driving licences with known
+field values, rendered with PIL. Used as ground truth by the benchmarks.
+"""
+import io
+import os
+import random
+import string
+import sys
+from datetime import date, timedelta
+from typing import Dict, List, NamedTuple, Optional
+
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.mrz import check_digit  # noqa: E402
+
+IMAGES_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "images")
+
+FIRST_NAMES = ["RAHUL", "PRIYA", "AMIT", "SUNITA", "VIKRAM", "ANJALI", "ROHAN", "NEHA", "ARJUN", "KAVYA"]
+LAST_NAMES = ["SHARMA", "KUMAR", "VERMA", "SINGH", "PATEL", "GUPTA", "REDDY", "IYER", "NAIR", "DAS"]
+
+
+class Sample(NamedTuple):
+    name: str
+    document_type: str
+    image_bytes: bytes
+    # Expected field values (dates as YYYY-MM-DD); None for the real samples
+    truth: Optional[Dict[str, str]]
+
+
+def _font(size: int):
+    return ImageFont.load_default(size=size)
+
+
+def _random_date(rng: random.Random, start_year: int, end_year: int) -> date:
+    start = date(start_year, 1, 1)
+    return start + timedelta(days=rng.randrange((date(end_year, 12, 31) - start).days))
+
+
+def _finish(image: Image.Image, rng: random.Random) -> bytes:
+    # A little blur, rotation and JPEG compression, like a phone photo
+    image = image.rotate(rng.uniform(-2, 2), resample=Image.BICUBIC, expand=True, fillcolor=(200, 200, 200))
+    image = image.filter(ImageFilter.GaussianBlur(rng.uniform(0.3, 0.9)))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=rng.randint(75, 92))
+    return buffer.getvalue()
+
+
+def _name(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def render_pan(rng: random.Random) -> Sample:
+    number = "".join(rng.choices(string.ascii_uppercase, k=5)) + f"{rng.randrange(10000):04d}" + rng.choice(string.ascii_uppercase)
+    name, father = _name(rng), _name(rng)
+    birth = _random_date(rng, 1950, 2005)
+
+    image = Image.new("RGB", (1012, 638), (226, 236, 246))
+    draw = ImageDraw.Draw(image)
+    draw.text((40, 30), "INCOME TAX DEPARTMENT", font=_font(34), fill=(20, 20, 80))
+    draw.text((640, 30), "GOVT. OF INDIA", font=_font(34), fill=(20, 20, 80))
+    draw.rectangle((780, 140, 960, 360), outline=(90, 90, 90), width=3)  # photo
+    draw.text((40, 130), "Permanent Account Number Card", font=_font(26), fill=(30, 30, 30))
+    draw.text((40, 170), number, font=_font(40), fill=(0, 0, 0))
+    draw.text((40, 250), "Name", font=_font(22), fill=(60, 60, 60))
+    draw.text((40, 280), name, font=_font(32), fill=(0, 0, 0))
+    draw.text((40, 350), "Father's Name", font=_font(22), fill=(60, 60, 60))
+    draw.text((40, 380), father, font=_font(32), fill=(0, 0, 0))
+    draw.text((40, 450), "Date of Birth", font=_font(22), fill=(60, 60, 60))
+    draw.text((40, 480), birth.strftime("%d/%m/%Y"), font=_font(32), fill=(0, 0, 0))
+
+    truth = {
+        "documentNumber": number,
+        "fullName": name,
+        "fatherName": father,
+        "dateOfBirth": birth.isoformat(),
+    }
+    return Sample(f"pan-{number}", "pan_card", _finish(image, rng), truth)
+
+
+def _mrz_field(value: str, length: int) -> str:
+    return value.replace(" ", "<")[:length].ljust(length, "<")
+
+
+def render_passport(rng: random.Random) -> Sample:
+    number = rng.choice(string.ascii_uppercase) + f"{rng.randrange(10 ** 8):08d}"
+    surname, given = rng.choice(LAST_NAMES), rng.choice(FIRST_NAMES)
+    birth = _random_date(rng, 1950, 2005)
+    issue = _random_date(rng, 2018, 2024)
+    expiry = issue.replace(year=issue.year + 10)
+    sex = rng.choice("MF")
+
+    number_field = _mrz_field(number, 9)
+    birth_field, expiry_field = birth.strftime("%y%m%d"), expiry.strftime("%y%m%d")
+    line1 = _mrz_field(f"P<IND{surname}<<{given}", 44)
+    line2 = (
+        number_field + check_digit(number_field) + "IND"
+        + birth_field + check_digit(birth_field) + sex
+        + expiry_field + check_digit(expiry_field)
+        + "<" * 14 + "0"
+    )
+    line2 += check_digit(line2[0:10] + line2[13:20] + line2[21:43])
+
+    image = Image.new("RGB", (1250, 880), (240, 238, 228))
+    draw = ImageDraw.Draw(image)
+    draw.text((360, 40), "REPUBLIC OF INDIA", font=_font(36), fill=(40, 40, 90))
+    draw.rectangle((50, 120, 320, 470), outline=(90, 90, 90), width=3)  # photo
+    rows = [
+        ("Passport No.", number),
+        ("Surname", surname),
+        ("Given Names", given),
+        ("Date of Birth", birth.strftime("%d/%m/%Y")),
+        ("Date of Issue", issue.strftime("%d/%m/%Y")),
+        ("Date of Expiry", expiry.strftime("%d/%m/%Y")),
+    ]
+    for i, (label, value) in enumerate(rows):
+        draw.text((370, 120 + i * 70), f"{label}: {value}", font=_font(30), fill=(0, 0, 0))
+    draw.text((50, 720), line1, font=_font(38), fill=(0, 0, 0))
+    draw.text((50, 780), line2, font=_font(38), fill=(0, 0, 0))
+
+    truth = {
+        "documentNumber": number,
+        "fullName": f"{given} {surname}",
+        "dateOfBirth": birth.isoformat(),
+        "dateOfExpiry": expiry.isoformat(),
+    }
+    return Sample(f"passport-{number}", "passport", _finish(image, rng), truth)
+
+
+def render_license(rng: random.Random) -> Sample:
+    number = f"{rng.choice(['MH', 'DL', 'KA', 'TN'])}{rng.randrange(100):02d} {rng.randrange(2000, 2024)}{rng.randrange(10 ** 7):07d}"
+    name = _name(rng)
+    birth = _random_date(rng, 1950, 2005)
+    expiry = _random_date(rng, 2026, 2040)
+
+    image = Image.new("RGB", (1012, 638), (250, 244, 230))
+    draw = ImageDraw.Draw(image)
+    draw.text((40, 30), "DRIVING LICENCE", font=_font(38), fill=(120, 20, 20))
+    draw.rectangle((780, 120, 960, 340), outline=(90, 90, 90), width=3)  # photo
+    rows = [
+        ("DL No", number),
+        ("Name", name),
+        ("DOB", birth.strftime("%d-%m-%Y")),
+        ("Valid Till", expiry.strftime("%d-%m-%Y")),
+    ]
+    for i, (label, value) in enumerate(rows):
+        draw.text((40, 130 + i * 80), f"{label}: {value}", font=_font(30), fill=(0, 0, 0))
+
+    truth = {
+        "documentNumber": number,
+        "fullName": name,
+        "dateOfBirth": birth.isoformat(),
+        "dateOfExpiry": expiry.isoformat(),
+    }
+    return Sample(f"license-{number.replace(' ', '')}", "license", _finish(image, rng), truth)
+
+
+RENDERERS = {
+    "pan_card": render_pan,
+    "passport": render_passport,
+    "license": render_license,
+}
+
+
+def synthetic_samples(per_type: int, seed: int = 0) -> List[Sample]:
+    rng = random.Random(seed)
+    return [RENDERERS[document_type](rng) for _ in range(per_type) for document_type in RENDERERS]
+
+
+def real_samples(images_dir: str = IMAGES_DIR) -> List[Sample]:
+    """
+    The images/ samples, without ground truth: a driving licence photo and
+    screenshots of the capture UI (two of them showing the same licence).
+    """
+    samples = []
+    for filename in sorted(os.listdir(images_dir)):
+        with open(os.path.join(images_dir, filename), "rb") as f:
+            samples.append(Sample(filename, "license", f.read(), None))
+    return samples
@@ -0,0 +1,116 @@
+# benchmarks/upload_formats.py
+"""
+Upload size and server decode/preprocess time of camera-sized uploads versus
+images shrunk by the client as GET /api/capabilities asks (services/upload.py).
+
+Synthetic documents are upscaled to a phone camera resolution (--camera,
+longer side) and saved as JPEG, like a browser upload of the original photo.
+Each is then re-encoded the way frontend/src/App.tsx does it: scaled to
+UPLOAD_MAX_DIMENSION, grayscale, in every format of UPLOAD_FORMATS. All
+variants run through run_stages() of their document type (unregistered types
+as PAN cards); OCR time is not reported:
+
+    python benchmarks/upload_formats.py --synthetic 5 --camera 4032
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import sys
+from collections import defaultdict
+from typing import Dict, List
+
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthetic_cards import synthetic_samples, Sample  # noqa: E402
+from pipeline import FALLBACK_TYPE, summarize  # noqa: E402
+from services.pipeline import DOCUMENT_TYPES, run_stages  # noqa: E402
+from services.upload import UPLOAD_FORMATS, UPLOAD_GRAYSCALE, UPLOAD_MAX_DIMENSION, UPLOAD_QUALITY  # noqa: E402
+
+logging.basicConfig(level=logging.WARNING)
+
+# canvas.toBlob() format -> PIL format
+PIL_FORMATS = {"webp": "WEBP", "png": "PNG", "jpeg": "JPEG"}
+
+
+def camera_upload(sample: Sample, camera: int) -> bytes:
+    image = Image.open(io.BytesIO(sample.image_bytes)).convert("RGB")
+    scale = camera / max(image.size)
+    image = image.resize((round(image.width * scale), round(image.height * scale)), Image.BICUBIC)
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=92)
+    return buffer.getvalue()
+
+
+def client_upload(image_bytes: bytes, file_format: str) -> bytes:
+    """What the frontend sends for this photo in file_format."""
+    image = Image.open(io.BytesIO(image_bytes))
+    image = image.convert("L" if UPLOAD_GRAYSCALE else "RGB")
+    image.thumbnail((UPLOAD_MAX_DIMENSION, UPLOAD_MAX_DIMENSION), Image.LANCZOS)
+    buffer = io.BytesIO()
+    if file_format == "png":
+        # Canvas PNGs are RGBA even when the pixels are gray
+        image.convert("RGBA").save(buffer, format="PNG")
+    elif file_format == "jpeg":
+        image.save(buffer, format="JPEG", quality=round(UPLOAD_QUALITY * 100))
+    else:
+        # So are canvas WebPs (RGB): the format has no grayscale mode
+        image.convert("RGB").save(buffer, format=PIL_FORMATS[file_format], quality=round(UPLOAD_QUALITY * 100))
+    return buffer.getvalue()
+
+
+def run_benchmark(samples: List[Sample], runs: int, camera: int) -> dict:
+    sizes: Dict[str, List[int]] = defaultdict(list)
+    timings: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+
+    for sample in samples:
+        document_type = DOCUMENT_TYPES.get(sample.document_type) or DOCUMENT_TYPES[FALLBACK_TYPE]
+        original = camera_upload(sample, camera)
+        variants = {"camera jpeg": original}
+        variants.update({f"client {name}": client_upload(original, name) for name in UPLOAD_FORMATS})
+
+        for variant, image_bytes in variants.items():
+            sizes[variant].append(len(image_bytes))
+            # Untimed pass: imports and allocator warm-up
+            run_stages(image_bytes, document_type)
+            for _ in range(runs):
+                _, _, _, timer = run_stages(image_bytes, document_type)
+                for stage in ("decode", "preprocess"):
+                    timings[variant][stage].append(timer.stages.get(stage, 0.0))
+
+    return {
+        "documents": len(samples),
+        "runs": runs,
+        "camera": camera,
+        "maxDimension": UPLOAD_MAX_DIMENSION,
+        "variants": {
+            variant: {
+                "meanBytes": round(sum(sizes[variant]) / len(sizes[variant])),
+                "latency": {stage: summarize(values) for stage, values in timings[variant].items()},
+            }
+            for variant in sizes
+        },
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="timed passes per upload")
+    parser.add_argument("--synthetic", type=int, default=3, help="synthetic documents per type")
+    parser.add_argument("--camera", type=int, default=4032, help="longer side of the camera-sized uploads")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run_benchmark(synthetic_samples(args.synthetic, args.seed), args.runs, args.camera)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main_cli()
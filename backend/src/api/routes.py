@@ -1,8 +1,12 @@
 # src/api/routes.py
 from fastapi import APIRouter, File, UploadFile, HTTPException
-from services.document_processor import process_document_image
+from fastapi.responses import StreamingResponse
+from services.document_processor import process_document_image, FieldSource
+from services.ocr_pool import OCRPoolBusyError
+from services.batch import stream_batch_results
+from services.upload import read_upload, UploadError
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, Optional, List
 
 router = APIRouter()
 
@@ -13,6 +17,7 @@ class DocumentData(BaseModel):
     dateOfIssue: Optional[str]
     dateOfExpiry: Optional[str]
     isValid: bool
+    fieldSources: Dict[str, FieldSource] = {}
 
 @router.post("/process-document/", response_model=DocumentData)
 async def process_document(
@@ -20,11 +25,27 @@ async def process_document(
     documentType: str = "pan"
 ):
     try:
-        contents = await file.read()
-        print("File contents:")
-        if contents is None:
-            raise ValueError("No file contents found")
+        contents = await read_upload(file)
         result = await process_document_image(contents, documentType)
         return result
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except OCRPoolBusyError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/process-documents/batch")
+async def process_documents_batch(
+    files: List[UploadFile] = File(...),
+    documentType: str = "pan"
+):
+    """Process a list of images and/or zip archives, streaming NDJSON results."""
+    return StreamingResponse(
+        stream_batch_results(files, lambda contents: process_document_image(contents, documentType, wait=True)),
+        media_type="application/x-ndjson"
+    )
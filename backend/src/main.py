@@ -32,22 +32,45 @@
 
 
 # main.py
+import time
+# Measured from here: import and startup times are reported by GET /api/ready
+_started = time.perf_counter()
 from fastapi import FastAPI, File, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, PlainTextResponse, JSONResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, Optional, List
 import pytesseract
-from PIL import Image
-import io
-import re
 import json
-from datetime import datetime
+import asyncio
 import logging
 import os
+from services.ocr_pool import ocr_pool, OCRPoolBusyError
+from services.pipeline import (
+    process_document_bytes, stream_pages, is_document_type, near_duplicates_enabled, UnrecognizedDocument, AUTO,
+    DOCUMENT_TYPES
+)
+from services.pages import spool_pages, PageError
+from services.batch import stream_batch_results
+from services.document_processor import FieldSource
+from services.job_queue import get_job_queue
+from services.job_worker import JOB_INPROCESS_WORKERS, InvalidCallbackUrl, check_callback_url, run_workers
+from services.result_cache import result_cache
+from services.near_duplicates import near_duplicates
+from services.warmup import startup, warm_up
+from services.upload import (
+    read_upload, sniff_image_format, upload_limit_middleware, client_capabilities, TempFileStreamingResponse,
+    UploadError, DOCUMENT_FORMATS, UPLOAD_MAX_DOCUMENT_BYTES
+)
+from services.metrics import metrics_middleware, metrics_response
+from utils.profiler import profiler, folded
+from utils.logging_config import configure_logging, stop_logging, debug_request_middleware
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Configure logging (LOG_LEVEL, LOG_FORMAT, LOG_SAMPLE_RATE, LOG_DEBUG_REQUESTS)
+configure_logging()
 logger = logging.getLogger(__name__)
+startup.started = _started
+startup.import_seconds = round(time.perf_counter() - _started, 3)
 
 # Configure Tesseract path - important for MacOS
 # You might need to adjust this path based on your installation
@@ -62,7 +85,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+app.middleware("http")(metrics_middleware)
+app.middleware("http")(debug_request_middleware)
+app.middleware("http")(upload_limit_middleware)
+
+# "1" exposes /api/profiler/start and /api/profiler/stop
+PROFILER_ENDPOINTS = os.getenv("PROFILER_ENDPOINTS", "0") == "1"
 
 class DocumentResponse(BaseModel):
     documentType: str
@@ -72,86 +102,27 @@ class DocumentResponse(BaseModel):
     dateOfBirth: Optional[str]
     dateOfExpiry: Optional[str]
     isValid: bool
+    fieldSources: Dict[str, FieldSource] = {}
 
-def preprocess_image(image):
-    """Preprocess image to improve OCR accuracy"""
-    # Convert to RGB if necessary
-    if image.mode != 'RGB':
-        image = image.convert('RGB')
-    
-    # Resize while maintaining aspect ratio
-    max_size = 2000
-    ratio = min(max_size/image.width, max_size/image.height)
-    new_size = (int(image.width * ratio), int(image.height * ratio))
-    image = image.resize(new_size, Image.LANCZOS)
-    
-    return image
-
-def extract_pan_details(text: str) -> dict:
-    """Extract PAN card details from OCR text"""
-    logger.debug(f"Raw OCR text:\n{text}")
-    
-    lines = [line.strip() for line in text.split('\n') if line.strip()]
-    logger.debug(f"Processed lines:\n{lines}")
-    
-    result = {
-        'documentType': 'pan_card',
-        'documentNumber': '',
-        'fullName': '',
-        'fatherName': '',
-        'dateOfBirth': '',
-        'isValid': False
-    }
-    
-    # PAN number pattern: 5 alphabets + 4 numbers + 1 alphabet
-    pan_pattern = r'[A-Z]{5}[0-9]{4}[A-Z]{1}'
-    
-    for line in lines:
-        logger.debug(f"Processing line: {line}")
-        
-        # Extract PAN number
-        pan_match = re.search(pan_pattern, line)
-        if pan_match:
-            result['documentNumber'] = pan_match.group()
-            logger.debug(f"Found PAN number: {result['documentNumber']}")
-        
-        # Extract name (looking for common patterns)
-        if any(keyword in line.upper() for keyword in ['NAME', 'नाम']):
-            # Split on common delimiters and clean
-            parts = re.split(r'[:/]', line)
-            if len(parts) > 1:
-                result['fullName'] = parts[1].strip()
-                logger.debug(f"Found name: {result['fullName']}")
-        
-        # Extract father's name
-        if any(keyword in line.upper() for keyword in ["FATHER", "FATHER'S", 'पिता']):
-            parts = re.split(r'[:/]', line)
-            if len(parts) > 1:
-                result['fatherName'] = parts[1].strip()
-                logger.debug(f"Found father's name: {result['fatherName']}")
-        
-        # Extract date of birth
-        date_patterns = [
-            r'\d{2}/\d{2}/\d{4}',
-            r'\d{2}-\d{2}-\d{4}',
-            r'\d{2}\.\d{2}\.\d{4}'
-        ]
-        for pattern in date_patterns:
-            date_match = re.search(pattern, line)
-            if date_match and not result['dateOfBirth']:
-                result['dateOfBirth'] = date_match.group()
-                logger.debug(f"Found DOB: {result['dateOfBirth']}")
-                break
-    
-    # Basic validation
-    result['isValid'] = bool(
-        result['documentNumber'] and 
-        result['fullName'] and 
-        result['dateOfBirth']
-    )
-    
-    logger.debug(f"Final extracted result: {result}")
-    return result
+# Set at shutdown to stop in-process job workers
+job_workers_stop = asyncio.Event()
+
+@app.on_event("startup")
+async def start_warm_up():
+    # Runs in the background so /api/ready and /metrics answer meanwhile;
+    # the pool gets its warm-up initializer before any job can start it
+    asyncio.ensure_future(warm_up())
+
+@app.on_event("startup")
+async def start_job_workers():
+    if JOB_INPROCESS_WORKERS > 0:
+        asyncio.ensure_future(run_workers(get_job_queue(), JOB_INPROCESS_WORKERS, job_workers_stop))
+
+@app.on_event("shutdown")
+def shutdown_ocr_pool():
+    job_workers_stop.set()
+    ocr_pool.shutdown()
+    stop_logging()
 
 @app.post("/api/process-document/")
 async def process_document(
@@ -159,40 +130,163 @@ async def process_document(
     documentType: str = "pan_card"
 ):
     try:
-        logger.info(f"Processing document type: {documentType}")
-        logger.info(f"Received file: {file.filename}")
-        
-        # Read and process the image
-        contents = await file.read()
-        image = Image.open(io.BytesIO(contents))
-        
-        # Preprocess the image
-        processed_image = preprocess_image(image)
-        
-        # Configure Tesseract parameters
-        custom_config = r'--oem 3 --psm 3'
-        
-        # Perform OCR
-        logger.info("Starting OCR processing")
-        text = pytesseract.image_to_string(
-            processed_image,
-            config=custom_config,
-            lang='eng'  # you can add +hin for Hindi support if needed
-        )
-        logger.info("OCR processing completed")
-        
-        # Process based on document type
-        if documentType == "pan_card":
-            result = extract_pan_details(text)
-            logger.info("Document processing completed")
-            return result
-        else:
+        logger.debug("Processing %s upload %s", documentType, file.filename)
+
+        if not is_document_type(documentType):
             raise HTTPException(status_code=400, detail="Unsupported document type")
-    
+
+        contents = await read_upload(file)
+        return await process_document_bytes(contents, documentType)
+
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except UnrecognizedDocument as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except OCRPoolBusyError as e:
+        logger.warning("OCR pool is full, rejecting request")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error processing document: {str(e)}", exc_info=True)
+        logger.error("Error processing document: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/ready")
+async def ready():
+    """Readiness probe: 503 until the OCR workers are warm."""
+    return JSONResponse(status_code=200 if startup.ready else 503, content=startup.as_response())
+
+@app.get("/api/capabilities")
+async def capabilities():
+    """Upload size and encoding the pipeline prefers, and the accepted documentType values."""
+    return {**client_capabilities(), "documentTypes": [AUTO, *DOCUMENT_TYPES]}
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    return {**result_cache.stats(), "nearDuplicates": {**near_duplicates.stats(), "enabled": near_duplicates_enabled()}}
+
+@app.get("/metrics")
+async def metrics():
+    return metrics_response()
+
+@app.post("/api/profiler/start")
+async def start_profiler(interval: Optional[float] = None):
+    """Start sampling the API process and the OCR workers' jobs."""
+    if not PROFILER_ENDPOINTS:
+        raise HTTPException(status_code=404, detail="Not Found")
+    profiler.start(interval)
+    return {"active": True, "interval": profiler.interval}
+
+@app.post("/api/profiler/stop")
+async def stop_profiler():
+    """Stop sampling and return the stacks in folded (flamegraph) format."""
+    if not PROFILER_ENDPOINTS:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(folded(profiler.stop()))
+
+@app.post("/api/process-documents/batch")
+async def process_documents_batch(
+    files: List[UploadFile] = File(...),
+    documentType: str = "pan_card"
+):
+    """
+    Process many images (and/or zip archives of images) in one request.
+    Results are streamed back as NDJSON, one line per document, in the order
+    the documents finish.
+    """
+    if not is_document_type(documentType):
+        raise HTTPException(status_code=400, detail="Unsupported document type")
+
+    logger.info("Processing batch of %d uploads", len(files))
+    return StreamingResponse(
+        stream_batch_results(files, lambda contents: process_document_bytes(contents, documentType, wait=True)),
+        media_type="application/x-ndjson"
+    )
+
+@app.post("/api/process-document/pages")
+async def process_document_pages(
+    file: UploadFile = File(...),
+    documentType: str = "auto"
+):
+    """
+    Process every page of a scanned PDF or multi-page TIFF (plain images are
+    one page). Pages are OCRed in parallel across the workers and streamed
+    back as NDJSON, one line per page in completion order. With
+    documentType=auto each page is classified on its own.
+    """
+    if not is_document_type(documentType):
+        raise HTTPException(status_code=400, detail="Unsupported document type")
+    try:
+        contents = await read_upload(file, UPLOAD_MAX_DOCUMENT_BYTES, DOCUMENT_FORMATS)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    # Workers render their page from this file, the upload is not kept in memory
+    file_format = sniff_image_format(contents[:16])
+    try:
+        path, pages = await asyncio.to_thread(spool_pages, contents, file_format)
+    except PageError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    del contents
+
+    logger.info("Processing %d pages", len(pages), extra={"documentType": documentType})
+
+    async def results():
+        async for page in stream_pages(pages, documentType):
+            yield (json.dumps(page) + "\n").encode()
+
+    return TempFileStreamingResponse(results(), path, media_type="application/x-ndjson")
+
+@app.post("/api/jobs", status_code=202)
+async def submit_job(
+    file: UploadFile = File(...),
+    documentType: str = "pan_card",
+    priority: int = 0,
+    callbackUrl: Optional[str] = None
+):
+    """
+    Queue a document for OCR and return its job id straight away. Poll
+    GET /api/jobs/{id}, or pass callbackUrl to have the finished job POSTed.
+    Higher priorities are processed first.
+    """
+    if not is_document_type(documentType):
+        raise HTTPException(status_code=400, detail="Unsupported document type")
+    if callbackUrl is not None:
+        try:
+            await asyncio.to_thread(check_callback_url, callbackUrl)
+        except InvalidCallbackUrl as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    try:
+        contents = await read_upload(file)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    # sqlite calls block (the payload write, lock waits): keep them off the event loop
+    job = await asyncio.to_thread(
+        get_job_queue().enqueue, contents, documentType, priority=priority, callback_url=callbackUrl
+    )
+    logger.info("Queued job %s", job.id, extra={"documentType": documentType, "priority": priority})
+    return JSONResponse(
+        status_code=202,
+        content=job.as_response(),
+        headers={"Location": f"/api/jobs/{job.id}"}
+    )
+
+@app.get("/api/jobs/stats")
+async def job_stats():
+    return await asyncio.to_thread(get_job_queue().stats)
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await asyncio.to_thread(get_job_queue().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.as_response()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
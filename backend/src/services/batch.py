@@ -0,0 +1,115 @@
+# src/services/batch.py
+import asyncio
+import json
+import logging
+import os
+import zipfile
+import zlib
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, List, Optional, Tuple
+
+from fastapi import UploadFile
+from fastapi.encoders import jsonable_encoder
+
+from services.upload import check_image_bytes, read_capped
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of documents read ahead of the OCR workers. Keeps memory flat
+# regardless of batch size: only this many images are held at any time.
+BATCH_MAX_IN_FLIGHT = int(os.getenv("BATCH_MAX_IN_FLIGHT", (os.cpu_count() or 1) * 2))
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp', '.webp')
+# Raised for corrupt archives and members
+ARCHIVE_ERRORS = (zipfile.BadZipFile, zlib.error, OSError)
+
+
+def is_zip_upload(file: UploadFile) -> bool:
+    if file.content_type in ("application/zip", "application/x-zip-compressed"):
+        return True
+    if file.filename and file.filename.lower().endswith(".zip"):
+        return True
+    return False
+
+
+def iter_batch_images(files: List[UploadFile]) -> Iterator[Tuple[str, Optional[bytes], Optional[str]]]:
+    """
+    Yield (name, bytes, None) for every image in the batch, and (name, None,
+    error) for an archive or member that cannot be read; the uploads after it
+    are still processed.
+    Zip archives are expanded one member at a time, never all at once, and no
+    member is read past the per-image size cap.
+    """
+    for file in files:
+        file.file.seek(0)
+        if not is_zip_upload(file):
+            yield file.filename, read_capped(file.file), None
+            continue
+        try:
+            archive = zipfile.ZipFile(file.file)
+        except ARCHIVE_ERRORS as e:
+            yield file.filename, None, f"Invalid archive: {e}"
+            continue
+        with archive:
+            for info in archive.infolist():
+                if info.is_dir() or not info.filename.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                name = f"{file.filename}/{info.filename}"
+                try:
+                    with archive.open(info) as member:
+                        contents = read_capped(member)
+                except ARCHIVE_ERRORS as e:
+                    yield name, None, f"Invalid archive member: {e}"
+                    continue
+                yield name, contents, None
+
+
+async def stream_batch_results(
+    files: List[UploadFile],
+    process: Callable[[bytes], Awaitable[Any]],
+    max_in_flight: int = BATCH_MAX_IN_FLIGHT
+) -> AsyncIterator[bytes]:
+    """
+    Run `process` over every image in the batch and yield one NDJSON line per
+    document as soon as it finishes (completion order, not upload order).
+    """
+    images = iter_batch_images(files)
+    pending = {}
+    index = 0
+    exhausted = False
+
+    async def run(item_index: int, name: str, contents: bytes) -> dict:
+        try:
+            result = await process(check_image_bytes(contents))
+            return {"index": item_index, "filename": name, "status": "ok", "result": jsonable_encoder(result)}
+        except Exception as e:
+            logger.error("Batch item %s failed: %s", name, e)
+            return {"index": item_index, "filename": name, "status": "error", "error": str(e)}
+
+    try:
+        while True:
+            while not exhausted and len(pending) < max_in_flight:
+                # Reading uploads and inflating zip members blocks: keep it
+                # off the event loop
+                item = await asyncio.to_thread(next, images, None)
+                if item is None:
+                    exhausted = True
+                    break
+                name, contents, error = item
+                if error is not None:
+                    logger.error("Batch item %s failed: %s", name, error)
+                    yield (json.dumps({"index": index, "filename": name, "status": "error", "error": error}) + "\n").encode()
+                else:
+                    pending[asyncio.ensure_future(run(index, name, contents))] = index
+                index += 1
+
+            if not pending:
+                break
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                del pending[task]
+                yield (json.dumps(task.result()) + "\n").encode()
+    finally:
+        # Client went away or the stream was closed early
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,131 @@
+# src/services/classifier.py
+"""
+Document-type classification from a small thumbnail, before any OCR.
+
+Features are cheap global ones: aspect ratio (orientation-independent),
+whether a passport MRZ band is present, the hue of the light background
+and, to pick the preprocessing, contrast and sharpness. Each registered
+document type may declare hints (mrz, aspect_ratio, background_hue); a type
+is chosen when all of its hints match. Types without hints are never chosen.
+"""
+import io
+import logging
+import os
+from dataclasses import dataclass
+from typing import Iterable, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from services.mrz import find_mrz_band
+
+logger = logging.getLogger(__name__)
+
+# Longer side of the thumbnail the features are computed on
+CLASSIFIER_THUMBNAIL_SIZE = int(os.getenv("CLASSIFIER_THUMBNAIL_SIZE", 640))
+# Below either value the image is treated as hard to read and gets the
+# OpenCV preprocessing (CLASSIFIER_DIFFICULT_PREPROCESS) instead of the type's
+CLASSIFIER_MIN_CONTRAST = float(os.getenv("CLASSIFIER_MIN_CONTRAST", 20))
+CLASSIFIER_MIN_SHARPNESS = float(os.getenv("CLASSIFIER_MIN_SHARPNESS", 100))
+CLASSIFIER_DIFFICULT_PREPROCESS = os.getenv("CLASSIFIER_DIFFICULT_PREPROCESS", "balanced")
+
+# Background pixels: bright, and coloured enough for their hue to mean something
+BACKGROUND_MIN_VALUE = 150
+BACKGROUND_MIN_SATURATION = 8
+BACKGROUND_MIN_PIXELS = 100
+
+
+@dataclass(frozen=True)
+class ThumbnailFeatures:
+    aspect_ratio: float
+    has_mrz: bool
+    # Median hue of the background in degrees, None for grey/dark images
+    background_hue: Optional[float]
+    # Standard deviation of the grey levels
+    contrast: float
+    # Variance of the Laplacian
+    sharpness: float
+
+
+@dataclass(frozen=True)
+class Classification:
+    document_type: str
+    preprocess: str
+    # Number of hints that matched (more specific types win ties)
+    hints: int
+    features: ThumbnailFeatures
+
+
+def load_thumbnail(image_bytes: bytes, size: int = CLASSIFIER_THUMBNAIL_SIZE) -> Image.Image:
+    """RGB thumbnail; JPEGs are decoded at reduced size directly (PIL draft())."""
+    image = Image.open(io.BytesIO(image_bytes))
+    image.draft('RGB', (size, size))
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    image.thumbnail((size, size), Image.BILINEAR)
+    return image
+
+
+def thumbnail_features(image: Image.Image) -> ThumbnailFeatures:
+    rgb = np.asarray(image.convert('RGB') if image.mode != 'RGB' else image)
+    gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+    height, width = gray.shape
+
+    # Hue of the central area's background (edges are often table or hand)
+    hsv = cv2.cvtColor(rgb[height // 5:height * 4 // 5, width // 5:width * 4 // 5], cv2.COLOR_RGB2HSV)
+    background = (hsv[..., 2] > BACKGROUND_MIN_VALUE) & (hsv[..., 1] > BACKGROUND_MIN_SATURATION)
+    background_hue = None
+    if np.count_nonzero(background) >= BACKGROUND_MIN_PIXELS:
+        # OpenCV hue is 0-179
+        background_hue = float(np.median(hsv[..., 0][background])) * 2
+
+    return ThumbnailFeatures(
+        aspect_ratio=max(width, height) / float(min(width, height)),
+        has_mrz=find_mrz_band(gray) is not None,
+        background_hue=background_hue,
+        contrast=float(gray.std()),
+        sharpness=float(cv2.Laplacian(gray, cv2.CV_64F).var()),
+    )
+
+
+def _in_range(value: Optional[float], bounds: Tuple[float, float]) -> bool:
+    return value is not None and bounds[0] <= value <= bounds[1]
+
+
+def match_hints(document_type, features: ThumbnailFeatures) -> Optional[int]:
+    """Number of the type's hints, if all of them match; None otherwise (or without hints)."""
+    checks = []
+    if document_type.mrz:
+        checks.append(features.has_mrz)
+    if document_type.aspect_ratio:
+        checks.append(_in_range(features.aspect_ratio, document_type.aspect_ratio))
+    if document_type.background_hue:
+        checks.append(_in_range(features.background_hue, document_type.background_hue))
+    if not checks or not all(checks):
+        return None
+    return len(checks)
+
+
+def classify_features(features: ThumbnailFeatures, document_types: Iterable) -> Optional[Classification]:
+    """Most specific registered type whose hints all match, or None."""
+    best = None
+    for document_type in document_types:
+        hints = match_hints(document_type, features)
+        if hints is not None and (best is None or hints > best[1]):
+            best = (document_type, hints)
+    if best is None:
+        return None
+
+    document_type, hints = best
+    preprocess = document_type.preprocess
+    if features.contrast < CLASSIFIER_MIN_CONTRAST or features.sharpness < CLASSIFIER_MIN_SHARPNESS:
+        preprocess = CLASSIFIER_DIFFICULT_PREPROCESS
+    return Classification(document_type.name, preprocess, hints, features)
+
+
+def classify_image(image: Image.Image, document_types: Iterable) -> Optional[Classification]:
+    features = thumbnail_features(image)
+    classification = classify_features(features, document_types)
+    logger.debug("Thumbnail features %s -> %s", features, classification and classification.document_type)
+    return classification
@@ -0,0 +1,283 @@
+# src/services/field_extraction.py
+"""
+Declarative, single-pass field extraction from OCR text.
+
+Each document type lists its fields once (value patterns, label keywords,
+date roles). At import time all of them are compiled into one alternation
+regex per document type, so extracting every field is a single `finditer`
+over the text: value patterns, labels, dates, candidate name lines and line
+breaks all come out of the same scan and are dispatched on the group name.
+"""
+import re
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+class ParsedDate(NamedTuple):
+    raw: str
+    iso: str
+
+
+# (start, end) character offsets of a value in the OCR text
+Span = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class PatternField:
+    """Value recognised by its own shape (e.g. a PAN number). Earlier patterns win."""
+    name: str
+    patterns: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class LabelField:
+    """Value that follows a label, on the same line or on the next one."""
+    name: str
+    labels: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class DocumentSpec:
+    pattern_fields: Tuple[PatternField, ...] = ()
+    label_fields: Tuple[LabelField, ...] = ()
+    # Date role -> label keywords that mark a date as that role
+    date_roles: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+    # How unlabelled dates fill the remaining roles: 'text_order' gives the
+    # first role to the first date in the text, 'chronological' assigns
+    # earliest -> first role, second -> second, latest -> third
+    date_fallback: str = 'chronological'
+    # Field filled with the first "looks like a name" line when no label matched
+    name_fallback: Optional[str] = None
+
+
+MONTHS = {
+    'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4, 'MAY': 5, 'JUN': 6,
+    'JUL': 7, 'AUG': 8, 'SEP': 9, 'OCT': 10, 'NOV': 11, 'DEC': 12,
+}
+DAYS_IN_MONTH = (31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+DATE_PATTERNS = {
+    'date_dmy': r'\b\d{2}[/.-]\d{2}[/.-]\d{4}\b',  # DD/MM/YYYY, DD-MM-YYYY, DD.MM.YYYY
+    'date_ymd': r'\b\d{4}[/-]\d{2}[/-]\d{2}\b',  # YYYY/MM/DD or YYYY-MM-DD
+    'date_text': r'(?i:\b\d{1,2}\s(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s\d{4}\b)',
+}
+
+NAME_LINE_PATTERN = r"^[ \t]*[A-Z][a-zA-Z \t'-]{2,}$"
+NON_NAME_WORDS = re.compile(
+    r'PASSPORT|LICEN[CS]E|VALID|EXPIRES|INCOME|TAX|DEPARTMENT|GOVT|GOVERNMENT|INDIA|REPUBLIC|PERMANENT|ACCOUNT|NUMBER|CARD',
+    re.IGNORECASE
+)
+VALUE_STRIP = " \t:/-.|"
+
+# Labels that only describe the value that follows them on the next line
+# (nothing but delimiters after them) are resolved on the next line break.
+MAX_VALUE_LINE_DISTANCE = 2
+
+
+def stripped_value(text: str, start: int, end: int, chars: Optional[str] = VALUE_STRIP) -> Tuple[str, Span]:
+    """text[start:end] stripped of `chars`, and the span of what is left."""
+    raw = text[start:end]
+    value = raw.strip(chars)
+    start += len(raw) - len(raw.lstrip(chars))
+    return value, (start, start + len(value))
+
+
+def parse_date(raw: str, kind: str) -> Optional[str]:
+    """Fixed-format date parser for the three DATE_PATTERNS shapes -> YYYY-MM-DD."""
+    try:
+        if kind == 'date_dmy':
+            day, month, year = int(raw[0:2]), int(raw[3:5]), int(raw[6:10])
+        elif kind == 'date_ymd':
+            year, month, day = int(raw[0:4]), int(raw[5:7]), int(raw[8:10])
+        else:
+            parts = raw.split()
+            day, month, year = int(parts[0]), MONTHS.get(parts[1][:3].upper(), 0), int(parts[2])
+    except (ValueError, IndexError):
+        return None
+    if not 1 <= month <= 12 or not 1 <= day <= DAYS_IN_MONTH[month - 1]:
+        return None
+    if month == 2 and day == 29 and not (year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)):
+        return None
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+
+class CompiledSpec:
+    """A DocumentSpec compiled into one regex plus group-name dispatch tables."""
+
+    def __init__(self, spec: DocumentSpec):
+        self.spec = spec
+        self.value_groups: Dict[str, Tuple[str, int]] = {}
+        self.label_groups: Dict[str, str] = {}
+        self.date_label_groups: Dict[str, str] = {}
+        parts = []
+
+        # Labels first: at the same position a label must beat a name line
+        for label_field in spec.label_fields:
+            group = f"label_{len(self.label_groups)}"
+            self.label_groups[group] = label_field.name
+            parts.append(f"(?P<{group}>(?i:{'|'.join(label_field.labels)}))")
+        for role, labels in spec.date_roles.items():
+            group = f"datelabel_{len(self.date_label_groups)}"
+            self.date_label_groups[group] = role
+            parts.append(f"(?P<{group}>(?i:{'|'.join(labels)}))")
+        for pattern_field in spec.pattern_fields:
+            for priority, pattern in enumerate(pattern_field.patterns):
+                group = f"value_{len(self.value_groups)}"
+                self.value_groups[group] = (pattern_field.name, priority)
+                parts.append(f"(?P<{group}>{pattern})")
+        for kind, pattern in DATE_PATTERNS.items():
+            parts.append(f"(?P<{kind}>{pattern})")
+        if spec.name_fallback:
+            parts.append(f"(?m:(?P<name_line>{NAME_LINE_PATTERN}))")
+        parts.append(r"(?P<newline>\n)")
+
+        self.regex = re.compile("|".join(parts))
+
+    def extract(self, text: str, spans: Optional[Dict[str, Span]] = None) -> dict:
+        spec = self.spec
+        # Every value is kept with its span in the text
+        values: Dict[str, Tuple[int, str, Span]] = {}
+        labelled: Dict[str, Tuple[str, Span]] = {}
+        dates: Dict[str, Tuple[ParsedDate, Span]] = {}
+        unlabelled_dates: List[Tuple[ParsedDate, Span]] = []
+        name_line: Optional[Tuple[str, Span]] = None
+
+        # Label whose value is still being read: (field, value start, lines waited)
+        pending: Optional[List] = None
+        # Date role label seen recently: (role, line number)
+        date_role: Optional[Tuple[str, int]] = None
+        line_number = 0
+
+        for match in self.regex.finditer(text):
+            group = match.lastgroup
+
+            # Another field starting on the value's line ends the value there
+            if pending is not None and group not in ('newline', 'name_line'):
+                value, span = stripped_value(text, pending[1], match.start())
+                if value:
+                    labelled.setdefault(pending[0], (value, span))
+                    pending = None
+                elif pending[2] > 0 or group in DATE_PATTERNS:
+                    # Waiting for the next line but it starts with another
+                    # field, or a date directly follows a text label
+                    pending = None
+
+            if group == 'newline':
+                if pending is not None:
+                    value, span = stripped_value(text, pending[1], match.start())
+                    if value:
+                        labelled.setdefault(pending[0], (value, span))
+                        pending = None
+                    elif pending[2] >= MAX_VALUE_LINE_DISTANCE:
+                        pending = None
+                    else:
+                        pending[1] = match.end()
+                        pending[2] += 1
+                line_number += 1
+
+            elif group in self.label_groups:
+                pending = [self.label_groups[group], match.end(), 0]
+
+            elif group in self.date_label_groups:
+                date_role = (self.date_label_groups[group], line_number)
+
+            elif group in self.value_groups:
+                name, priority = self.value_groups[group]
+                if name not in values or priority < values[name][0]:
+                    values[name] = (priority, match.group(), match.span())
+
+            elif group in DATE_PATTERNS:
+                raw = match.group()
+                iso = parse_date(raw, group)
+                if iso is None:
+                    continue
+                parsed = (ParsedDate(raw, iso), match.span())
+                if date_role is not None and line_number - date_role[1] <= 1 and date_role[0] not in dates:
+                    dates[date_role[0]] = parsed
+                    date_role = None
+                else:
+                    unlabelled_dates.append(parsed)
+
+            elif group == 'name_line':
+                if name_line is None and not NON_NAME_WORDS.search(match.group()):
+                    name_line = stripped_value(text, match.start(), match.end(), None)
+
+        if pending is not None:
+            line_end = text.find('\n', pending[1])
+            value, span = stripped_value(text, pending[1], len(text) if line_end < 0 else line_end)
+            if value:
+                labelled.setdefault(pending[0], (value, span))
+
+        found = {name: (value, span) for name, (_, value, span) in values.items()}
+        found.update(labelled)
+        if spec.name_fallback and spec.name_fallback not in found and name_line:
+            found[spec.name_fallback] = name_line
+
+        # Fill the roles no label claimed from the unlabelled dates
+        roles = [role for role in spec.date_roles if role not in dates]
+        if roles and unlabelled_dates:
+            if spec.date_fallback == 'text_order':
+                for role, parsed in zip(roles, unlabelled_dates):
+                    dates[role] = parsed
+            else:
+                ordered = sorted(unlabelled_dates, key=lambda parsed: parsed[0].iso)
+                picks = [ordered[0], ordered[1] if len(ordered) > 1 else None, ordered[-1] if len(ordered) > 2 else None]
+                for role, parsed in zip(roles, picks):
+                    if parsed is not None:
+                        dates[role] = parsed
+        found.update(dates)
+        if spans is not None:
+            spans.update((name, span) for name, (_, span) in found.items())
+        return {name: value for name, (value, _) in found.items()}
+
+
+PAN_NUMBER = r'\b[A-Z]{5}[0-9]{4}[A-Z]\b'
+
+DOCUMENT_SPECS: Dict[str, DocumentSpec] = {
+    'pan_card': DocumentSpec(
+        pattern_fields=(PatternField('documentNumber', (PAN_NUMBER,)),),
+        label_fields=(
+            # Father's label first so "Father's Name" is not read as "Name"
+            LabelField('fatherName', (r"पिता का नाम", r"\bfather'?s?\s*name\b", r"\bfather\b", r"पिता")),
+            LabelField('fullName', (r"\bname\b", r"नाम")),
+        ),
+        date_roles={'dateOfBirth': (r'birth', r'\bdob\b', r'\bborn\b', r'जन्म')},
+        date_fallback='text_order',
+        name_fallback='fullName',
+    ),
+    'passport': DocumentSpec(
+        pattern_fields=(PatternField('documentNumber', (
+            r'[A-Z]\d{8}',  # Standard format
+            r'[A-Z]{2}\d{7}',  # Alternative format
+            r'\b\d{9}\b',  # Numeric only format
+        )),),
+        label_fields=(
+            LabelField('fatherName', (r"\bfather'?s?\s*name\b", r"\bfather\b")),
+            LabelField('fullName', (r"\bgiven\s+names?\b", r"\bsurname\b", r"\bname\b")),
+        ),
+        date_roles={
+            'dateOfBirth': (r'birth', r'\bdob\b', r'\bborn\b'),
+            'dateOfIssue': (r'\bissued?\b', r'\bissue\b'),
+            'dateOfExpiry': (r'\bexpiry\b', r'\bexpires\b', r'valid\s+until', r'\bvalidity\b'),
+        },
+        name_fallback='fullName',
+    ),
+}
+# api/routes.py PAN documents: the card's fields, but unlabelled dates fall
+# back to chronological order like that endpoint always did
+DOCUMENT_SPECS['pan'] = replace(DOCUMENT_SPECS['pan_card'], date_fallback='chronological')
+
+COMPILED_SPECS: Dict[str, CompiledSpec] = {name: CompiledSpec(spec) for name, spec in DOCUMENT_SPECS.items()}
+
+
+def extract_fields(text: str, document_type: str, spans: Optional[Dict[str, Span]] = None) -> dict:
+    """
+    Extract every field of `document_type` from OCR text in one pass.
+    Text fields map to strings, date fields to ParsedDate(raw, iso). When a
+    `spans` dict is given, it receives the (start, end) of each value in
+    `text`, to look up the OCR words it was read from.
+    """
+    compiled = COMPILED_SPECS.get(document_type.lower())
+    if compiled is None:
+        raise ValueError(f"No field spec for document type: {document_type}")
+    return compiled.extract(text, spans)
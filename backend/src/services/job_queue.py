@@ -0,0 +1,379 @@
+# src/services/job_queue.py
+"""
+Persistent queue of OCR jobs for the submit/poll API (POST /api/jobs,
+GET /api/jobs/{id}).
+
+Jobs are claimed by workers (services/job_worker.py) in priority order and
+leased for a visibility timeout: a job whose worker died becomes claimable
+again when its lease expires. Failed jobs are retried with a growing delay
+until JOB_MAX_ATTEMPTS is reached. A claim's attempt number is its lease:
+a worker whose lease expired and whose job was claimed again can no longer
+complete or fail it.
+
+SqliteJobQueue is shared by the API and any number of worker processes on
+the same host; MemoryJobQueue is an in-process stand-in for a single
+process (tests, development).
+"""
+import heapq
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# "sqlite" (JOB_QUEUE_PATH) or "memory" (lost on restart, API process only)
+JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "sqlite")
+# Outside the source tree and independent of the working directory, so the
+# API and workers started anywhere on the host share one queue
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH") or os.path.join(
+    os.getenv("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state"),
+    "docuville", "jobs.sqlite3"
+)
+# Seconds a claimed job stays invisible to other workers
+JOB_VISIBILITY_TIMEOUT = float(os.getenv("JOB_VISIBILITY_TIMEOUT", 300))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+# Delay before a failed job is retried, multiplied by its attempt count
+JOB_RETRY_DELAY = float(os.getenv("JOB_RETRY_DELAY", 5))
+# Seconds finished jobs (and their results) are kept for polling
+JOB_RETENTION = float(os.getenv("JOB_RETENTION", 24 * 3600))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class LeaseLost(Exception):
+    """The job is no longer leased to this attempt (expired and claimed again, or purged)"""
+
+
+@dataclass(frozen=True)
+class Job:
+    id: str
+    document_type: str
+    status: str
+    priority: int = 0
+    attempts: int = 0
+    max_attempts: int = JOB_MAX_ATTEMPTS
+    callback_url: Optional[str] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created: float = 0.0
+    updated: float = 0.0
+    # Earliest time the job may be claimed (lease expiry while running)
+    visible_at: float = 0.0
+
+    def as_response(self) -> dict:
+        """GET /api/jobs/{id} body"""
+        return {
+            "id": self.id,
+            "status": self.status,
+            "documentType": self.document_type,
+            "priority": self.priority,
+            "attempts": self.attempts,
+            "result": self.result,
+            "error": self.error,
+            "createdAt": self.created,
+            "updatedAt": self.updated,
+        }
+
+
+class JobQueue:
+    """Common interface for the job queue backends"""
+
+    def enqueue(
+        self,
+        payload: bytes,
+        document_type: str,
+        priority: int = 0,
+        callback_url: Optional[str] = None,
+        max_attempts: int = JOB_MAX_ATTEMPTS
+    ) -> Job:
+        raise NotImplementedError
+
+    def get(self, job_id: str) -> Optional[Job]:
+        raise NotImplementedError
+
+    def claim(self, visibility_timeout: float = JOB_VISIBILITY_TIMEOUT) -> Optional[Tuple[Job, bytes]]:
+        """Lease the highest-priority visible job; returns (job, payload) or None."""
+        raise NotImplementedError
+
+    def complete(self, job_id: str, attempt: int, result: dict) -> Job:
+        """Store the result of claim attempt `attempt`; LeaseLost if the job was claimed since."""
+        raise NotImplementedError
+
+    def fail(self, job_id: str, attempt: int, error: str, retry: bool = True) -> Job:
+        """
+        Requeue the job after a delay, or mark it failed when out of attempts.
+        LeaseLost if the job was claimed since attempt `attempt`.
+        """
+        raise NotImplementedError
+
+    def purge(self, older_than: float = JOB_RETENTION) -> int:
+        """Delete finished jobs last updated more than older_than seconds ago."""
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, int]:
+        """Job count per status"""
+        raise NotImplementedError
+
+
+def _retry_state(job: Job, error: str, retry: bool, now: float) -> Job:
+    if retry and job.attempts < job.max_attempts:
+        logger.warning("Job %s failed (attempt %d/%d), retrying: %s", job.id, job.attempts, job.max_attempts, error)
+        return replace(job, status=QUEUED, error=error, updated=now, visible_at=now + JOB_RETRY_DELAY * job.attempts)
+    logger.error("Job %s failed after %d attempt(s): %s", job.id, job.attempts, error)
+    return replace(job, status=FAILED, error=error, updated=now)
+
+
+class MemoryJobQueue(JobQueue):
+    """In-process stand-in: jobs live in a dict, visible ones in a heap"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._payloads: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def enqueue(self, payload, document_type, priority=0, callback_url=None, max_attempts=JOB_MAX_ATTEMPTS):
+        now = time.time()
+        job = Job(
+            uuid.uuid4().hex, document_type, QUEUED, priority, max_attempts=max_attempts,
+            callback_url=callback_url, created=now, updated=now, visible_at=now
+        )
+        with self._lock:
+            self._jobs[job.id] = job
+            self._payloads[job.id] = payload
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def claim(self, visibility_timeout=JOB_VISIBILITY_TIMEOUT):
+        now = time.time()
+        with self._lock:
+            candidates: List[Tuple[int, float, str]] = []
+            for job in self._jobs.values():
+                if job.status not in (QUEUED, RUNNING) or job.visible_at > now:
+                    continue
+                if job.status == RUNNING and job.attempts >= job.max_attempts:
+                    self._jobs[job.id] = _retry_state(job, "Visibility timeout expired", False, now)
+                    self._payloads.pop(job.id, None)
+                    continue
+                heapq.heappush(candidates, (-job.priority, job.created, job.id))
+            if not candidates:
+                return None
+            job = self._jobs[candidates[0][2]]
+            job = replace(job, status=RUNNING, attempts=job.attempts + 1, updated=now, visible_at=now + visibility_timeout)
+            self._jobs[job.id] = job
+            return job, self._payloads[job.id]
+
+    def _leased(self, job_id: str, attempt: int) -> Job:
+        job = self._jobs.get(job_id)
+        if job is None or job.status != RUNNING or job.attempts != attempt:
+            raise LeaseLost(f"Job {job_id} is no longer leased to attempt {attempt}")
+        return job
+
+    def complete(self, job_id, attempt, result):
+        with self._lock:
+            job = replace(self._leased(job_id, attempt), status=DONE, result=result, error=None, updated=time.time())
+            self._jobs[job_id] = job
+            self._payloads.pop(job_id, None)
+        return job
+
+    def fail(self, job_id, attempt, error, retry=True):
+        with self._lock:
+            job = _retry_state(self._leased(job_id, attempt), error, retry, time.time())
+            self._jobs[job_id] = job
+            if job.status == FAILED:
+                self._payloads.pop(job_id, None)
+        return job
+
+    def purge(self, older_than=JOB_RETENTION):
+        cutoff = time.time() - older_than
+        with self._lock:
+            expired = [
+                job.id for job in self._jobs.values() if job.status in (DONE, FAILED) and job.updated < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return len(expired)
+
+    def stats(self):
+        counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED)}
+        for job in list(self._jobs.values()):
+            counts[job.status] += 1
+        return counts
+
+
+class SqliteJobQueue(JobQueue):
+    """
+    Jobs in a sqlite table (WAL mode), safe to share between processes.
+    Claims run in an IMMEDIATE transaction so two workers never lease the
+    same job; the payload is dropped once the job is finished.
+    """
+
+    _COLUMNS = (
+        "id, document_type, status, priority, attempts, max_attempts, callback_url, result, error, "
+        "created, updated, visible_at"
+    )
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._local = threading.local()
+        self._db().executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                document_type TEXT NOT NULL,
+                status TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                attempts INTEGER NOT NULL,
+                max_attempts INTEGER NOT NULL,
+                callback_url TEXT,
+                result TEXT,
+                error TEXT,
+                created REAL NOT NULL,
+                updated REAL NOT NULL,
+                visible_at REAL NOT NULL,
+                payload BLOB
+            );
+            CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, priority DESC, created);
+        """)
+
+    def _db(self) -> sqlite3.Connection:
+        # One connection per thread (and per process: workers open their own)
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, isolation_level=None, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+        return db
+
+    def _row_to_job(self, row) -> Job:
+        return Job(
+            id=row[0], document_type=row[1], status=row[2], priority=row[3], attempts=row[4],
+            max_attempts=row[5], callback_url=row[6], result=json.loads(row[7]) if row[7] else None,
+            error=row[8], created=row[9], updated=row[10], visible_at=row[11]
+        )
+
+    def _save(self, db: sqlite3.Connection, job: Job, keep_payload: bool):
+        db.execute(
+            "UPDATE jobs SET status = ?, attempts = ?, result = ?, error = ?, updated = ?, visible_at = ?"
+            + ("" if keep_payload else ", payload = NULL") + " WHERE id = ?",
+            (job.status, job.attempts, json.dumps(job.result) if job.result is not None else None,
+             job.error, job.updated, job.visible_at, job.id)
+        )
+
+    def _finish(self, job_id: str, attempt: int, update: Callable[[Job], Job]) -> Job:
+        """Apply update to the job if claim `attempt` still holds its lease, in one transaction."""
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute(
+                f"SELECT {self._COLUMNS} FROM jobs WHERE id = ? AND status = ? AND attempts = ?",
+                (job_id, RUNNING, attempt)
+            ).fetchone()
+            if row is None:
+                raise LeaseLost(f"Job {job_id} is no longer leased to attempt {attempt}")
+            job = update(self._row_to_job(row))
+            # Only a requeued job is run again
+            self._save(db, job, job.status == QUEUED)
+            db.execute("COMMIT")
+            return job
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def enqueue(self, payload, document_type, priority=0, callback_url=None, max_attempts=JOB_MAX_ATTEMPTS):
+        now = time.time()
+        job = Job(
+            uuid.uuid4().hex, document_type, QUEUED, priority, max_attempts=max_attempts,
+            callback_url=callback_url, created=now, updated=now, visible_at=now
+        )
+        self._db().execute(
+            f"INSERT INTO jobs ({self._COLUMNS}, payload) VALUES (?, ?, ?, ?, ?, ?, ?, NULL, NULL, ?, ?, ?, ?)",
+            (job.id, job.document_type, job.status, job.priority, job.attempts, job.max_attempts,
+             job.callback_url, job.created, job.updated, job.visible_at, payload)
+        )
+        return job
+
+    def get(self, job_id):
+        row = self._db().execute(f"SELECT {self._COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def claim(self, visibility_timeout=JOB_VISIBILITY_TIMEOUT):
+        db = self._db()
+        now = time.time()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            # Leases that expired on their last attempt: the worker keeps dying on this job
+            for row in db.execute(
+                f"SELECT {self._COLUMNS} FROM jobs WHERE status = ? AND visible_at <= ? AND attempts >= max_attempts",
+                (RUNNING, now)
+            ).fetchall():
+                self._save(db, _retry_state(self._row_to_job(row), "Visibility timeout expired", False, now), False)
+
+            row = db.execute(
+                f"SELECT {self._COLUMNS}, payload FROM jobs WHERE status IN (?, ?) AND visible_at <= ? "
+                "ORDER BY priority DESC, created LIMIT 1",
+                (QUEUED, RUNNING, now)
+            ).fetchone()
+            if row is None:
+                db.execute("COMMIT")
+                return None
+            job = replace(
+                self._row_to_job(row), status=RUNNING, attempts=row[4] + 1, updated=now,
+                visible_at=now + visibility_timeout
+            )
+            self._save(db, job, True)
+            db.execute("COMMIT")
+            return job, row[12]
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def complete(self, job_id, attempt, result):
+        return self._finish(
+            job_id, attempt, lambda job: replace(job, status=DONE, result=result, error=None, updated=time.time())
+        )
+
+    def fail(self, job_id, attempt, error, retry=True):
+        return self._finish(job_id, attempt, lambda job: _retry_state(job, error, retry, time.time()))
+
+    def purge(self, older_than=JOB_RETENTION):
+        cursor = self._db().execute(
+            "DELETE FROM jobs WHERE status IN (?, ?) AND updated < ?", (DONE, FAILED, time.time() - older_than)
+        )
+        return cursor.rowcount
+
+    def stats(self):
+        counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED)}
+        counts.update(self._db().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return counts
+
+
+def create_job_queue(backend: str = JOB_QUEUE_BACKEND, path: str = JOB_QUEUE_PATH) -> JobQueue:
+    backend = backend.lower()
+    if backend == "memory":
+        return MemoryJobQueue()
+    if backend != "sqlite":
+        raise ValueError(f"Unknown job queue backend: {backend}")
+    return SqliteJobQueue(path)
+
+
+_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Return the job queue for this process, creating it on first use."""
+    global _queue
+    if _queue is None:
+        _queue = create_job_queue()
+    return _queue
@@ -0,0 +1,174 @@
+# src/services/job_worker.py
+"""
+Worker for the job queue (services/job_queue.py).
+
+Claims jobs, runs them through the OCR pipeline (its own OCR pool) and
+stores the result or schedules a retry. Finished jobs with a callback URL
+get their GET /api/jobs/{id} body POSTed to it. Workers are separate
+processes, so OCR capacity scales independently of the API:
+
+    cd backend/src && python -m services.job_worker
+"""
+import asyncio
+import ipaddress
+import json
+import logging
+import os
+import signal
+import socket
+import urllib.parse
+import urllib.request
+
+from fastapi.encoders import jsonable_encoder
+
+from services.job_queue import DONE, FAILED, JOB_QUEUE_BACKEND, Job, JobQueue, LeaseLost, get_job_queue
+from services.ocr_pool import OCR_POOL_WORKERS, ocr_pool
+from services.pipeline import UnrecognizedDocument, UnsupportedDocumentType, process_document_bytes
+from services.warmup import warm_up
+from utils.logging_config import configure_logging, stop_logging
+
+logger = logging.getLogger(__name__)
+
+# Jobs processed at once by one worker process
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", OCR_POOL_WORKERS))
+# Seconds between queue polls while it is empty
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 1.0))
+JOB_CALLBACK_TIMEOUT = float(os.getenv("JOB_CALLBACK_TIMEOUT", 10))
+# "1" lets callbacks reach private, loopback and link-local addresses
+# (development only: callback URLs are user input)
+JOB_CALLBACK_ALLOW_PRIVATE = os.getenv("JOB_CALLBACK_ALLOW_PRIVATE", "0") == "1"
+# Worker loops run inside the API process; the in-memory queue needs them
+JOB_INPROCESS_WORKERS = int(os.getenv("JOB_INPROCESS_WORKERS", 1 if JOB_QUEUE_BACKEND == "memory" else 0))
+
+# Seconds between deletions of expired finished jobs
+PURGE_INTERVAL = 600
+
+
+class InvalidCallbackUrl(ValueError):
+    """callbackUrl is not an http(s) URL of a public host"""
+
+
+class _NoRedirects(urllib.request.HTTPRedirectHandler):
+    """A redirect could point the callback at a host check_callback_url refused"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_callback_opener = urllib.request.build_opener(_NoRedirects)
+
+
+def check_callback_url(url: str) -> str:
+    """
+    Raise InvalidCallbackUrl unless `url` is http(s) and every address its
+    host resolves to is public (no private, loopback or link-local targets).
+    Resolves the host, so call it off the event loop.
+    """
+    parsed = urllib.parse.urlsplit(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise InvalidCallbackUrl("callbackUrl must be an http or https URL")
+    if JOB_CALLBACK_ALLOW_PRIVATE:
+        return url
+    try:
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        addresses = socket.getaddrinfo(parsed.hostname, port, proto=socket.IPPROTO_TCP)
+    except (OSError, ValueError) as e:
+        raise InvalidCallbackUrl(f"Cannot resolve callbackUrl host: {e}")
+    for *_, sockaddr in addresses:
+        address = ipaddress.ip_address(sockaddr[0])
+        if not address.is_global or address.is_multicast:
+            raise InvalidCallbackUrl("callbackUrl must point to a public address")
+    return url
+
+
+def send_callback(job: Job):
+    """POST the job's status and result to its callback URL (best effort, not retried)."""
+    request = urllib.request.Request(
+        job.callback_url,
+        data=json.dumps(job.as_response()).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        # Checked again: the host may resolve differently by now
+        check_callback_url(job.callback_url)
+        with _callback_opener.open(request, timeout=JOB_CALLBACK_TIMEOUT) as response:
+            logger.debug("Callback for job %s returned %s", job.id, response.status)
+    except Exception as e:
+        logger.warning("Callback for job %s failed: %s", job.id, e)
+
+
+async def process_job(queue: JobQueue, job: Job, payload: bytes) -> Job:
+    claimed = job
+    try:
+        try:
+            result = await process_document_bytes(payload, job.document_type, wait=True)
+        except (UnsupportedDocumentType, UnrecognizedDocument) as e:
+            job = await asyncio.to_thread(queue.fail, job.id, job.attempts, str(e), retry=False)
+        except Exception as e:
+            job = await asyncio.to_thread(queue.fail, job.id, job.attempts, str(e))
+        else:
+            job = await asyncio.to_thread(queue.complete, job.id, job.attempts, jsonable_encoder(result))
+    except LeaseLost:
+        # Took longer than the visibility timeout: another worker owns the job now
+        logger.warning("Job %s attempt %d lost its lease, dropping its outcome", claimed.id, claimed.attempts)
+        return claimed
+
+    if job.callback_url and job.status in (DONE, FAILED):
+        await asyncio.to_thread(send_callback, job)
+    return job
+
+
+async def worker_loop(queue: JobQueue, stop: asyncio.Event):
+    while not stop.is_set():
+        # Queue calls can wait on the sqlite lock: run them off the event loop
+        claimed = await asyncio.to_thread(queue.claim)
+        if claimed is None:
+            try:
+                await asyncio.wait_for(stop.wait(), JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        job, payload = claimed
+        logger.info("Processing job %s (attempt %d)", job.id, job.attempts)
+        await process_job(queue, job, payload)
+
+
+async def purge_loop(queue: JobQueue, stop: asyncio.Event):
+    while not stop.is_set():
+        purged = await asyncio.to_thread(queue.purge)
+        if purged:
+            logger.info("Purged %d finished jobs", purged)
+        try:
+            await asyncio.wait_for(stop.wait(), PURGE_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_workers(queue: JobQueue, concurrency: int, stop: asyncio.Event):
+    """Run `concurrency` worker loops until `stop` is set; in-flight jobs are finished first."""
+    logger.info("Starting %d job worker loops", concurrency)
+    await asyncio.gather(purge_loop(queue, stop), *(worker_loop(queue, stop) for _ in range(concurrency)))
+
+
+async def main():
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        # Claim jobs only once the OCR workers are warm
+        await warm_up()
+        await run_workers(get_job_queue(), JOB_WORKER_CONCURRENCY, stop)
+    finally:
+        ocr_pool.shutdown()
+
+
+if __name__ == "__main__":
+    configure_logging()
+    if JOB_QUEUE_BACKEND == "memory":
+        raise SystemExit("The memory job queue only lives in the API process, use JOB_INPROCESS_WORKERS")
+    try:
+        asyncio.run(main())
+    finally:
+        stop_logging()
@@ -0,0 +1,91 @@
+# src/services/metrics.py
+import os
+import time
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Dict, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+from services.ocr_pool import ocr_pool
+from utils.timing import StageTimer
+
+# OCR pool workers import this module through services.pipeline but never
+# serve HTTP; importing FastAPI there would add ~0.5 s to each worker start
+if TYPE_CHECKING:
+    from fastapi import Request, Response
+
+# "1" adds a Server-Timing header with the stage breakdown to every response
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0") == "1"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REQUEST_LATENCY = Histogram(
+    "docproc_request_duration_seconds", "HTTP request latency",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+STAGE_LATENCY = Histogram(
+    "docproc_stage_duration_seconds", "Document pipeline stage latency",
+    ["document_type", "stage"], buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_PROGRESS = Gauge("docproc_requests_in_progress", "HTTP requests being handled")
+# outcome: ok, cache_hit, busy (rejected with 503) or error; error rate is
+# rate(outcome="error") / rate(all outcomes)
+DOCUMENTS = Counter("docproc_documents_total", "Documents processed", ["document_type", "outcome"])
+
+OCR_IN_FLIGHT = Gauge("docproc_ocr_in_flight", "OCR jobs running in worker processes")
+OCR_IN_FLIGHT.set_function(lambda: ocr_pool.in_flight)
+OCR_QUEUE_DEPTH = Gauge("docproc_ocr_queue_depth", "OCR jobs waiting for a free worker")
+OCR_QUEUE_DEPTH.set_function(lambda: ocr_pool.queue_depth)
+OCR_CAPACITY = Gauge("docproc_ocr_capacity", "OCR jobs admitted before requests are rejected")
+OCR_CAPACITY.set_function(lambda: ocr_pool.capacity)
+
+# Stages recorded while handling the current request (for Server-Timing)
+request_timer: ContextVar[Optional[StageTimer]] = ContextVar("request_timer", default=None)
+
+
+def record_stages(document_type: str, stages: Dict[str, float]):
+    """Observe one document's stage durations (seconds)."""
+    for stage, seconds in stages.items():
+        STAGE_LATENCY.labels(document_type, stage).observe(seconds)
+    timer = request_timer.get()
+    if timer is not None:
+        timer.merge(stages)
+
+
+def count_document(document_type: str, outcome: str):
+    DOCUMENTS.labels(document_type, outcome).inc()
+
+
+def server_timing(stages: Dict[str, float], total: float) -> str:
+    entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in stages.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+async def metrics_middleware(request: 'Request', call_next):
+    """Request latency histogram, in-progress gauge and Server-Timing header."""
+    timer = StageTimer()
+    token = request_timer.set(timer)
+    started = time.perf_counter()
+    status = 500
+    REQUESTS_IN_PROGRESS.inc()
+    try:
+        # Streaming responses are timed to their first byte
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        REQUESTS_IN_PROGRESS.dec()
+        request_timer.reset(token)
+        total = time.perf_counter() - started
+        # Route templates, not raw paths, keep the label set bounded
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        REQUEST_LATENCY.labels(request.method, route, str(status)).observe(total)
+
+    if SERVER_TIMING:
+        response.headers["Server-Timing"] = server_timing(timer.stages, total)
+    return response
+
+
+def metrics_response() -> 'Response':
+    from fastapi import Response
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,221 @@
+# src/services/mrz.py
+import logging
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from services.ocr_engine import get_engine
+
+logger = logging.getLogger(__name__)
+
+MRZ_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789<"
+TD3_LINE_LENGTH = 44
+CHECK_WEIGHTS = (7, 3, 1)
+# find_mrz_band's kernels are sized for pages about this wide; wider pages are
+# searched on a copy downscaled to it
+MRZ_SEARCH_WIDTH = 1100
+
+# Fields' characters in the MRZ: (line, first, last + 1)
+TD3_FIELD_POSITIONS = {
+    'fullName': (0, 5, 44),
+    'documentNumber': (1, 0, 9),
+    'dateOfBirth': (1, 13, 19),
+    'dateOfExpiry': (1, 21, 27),
+}
+
+# Common OCR confusions in fields that can only contain digits
+DIGIT_FIXES = str.maketrans({'O': '0', 'Q': '0', 'D': '0', 'I': '1', 'L': '1', 'Z': '2', 'S': '5', 'B': '8', 'G': '6'})
+
+
+def check_digit(value: str) -> str:
+    """ICAO 9303 check digit: weights 7,3,1; digits as-is, A-Z = 10-35, '<' = 0."""
+    total = 0
+    for i, char in enumerate(value):
+        if char.isdigit():
+            number = ord(char) - 48
+        elif 'A' <= char <= 'Z':
+            number = ord(char) - 55
+        else:
+            number = 0
+        total += number * CHECK_WEIGHTS[i % 3]
+    return str(total % 10)
+
+
+def mrz_date(value: str, is_expiry: bool) -> Optional[str]:
+    """YYMMDD -> YYYY-MM-DD. Birth dates in the future belong to the 1900s."""
+    try:
+        year, month, day = int(value[0:2]), int(value[2:4]), int(value[4:6])
+    except ValueError:
+        return None
+    century = 2000
+    if not is_expiry and year > datetime.now().year % 100:
+        century = 1900
+    try:
+        return datetime(century + year, month, day).strftime('%Y-%m-%d')
+    except ValueError:
+        return None
+
+
+def parse_td3(line1: str, line2: str) -> dict:
+    """
+    Parse the two 44-character lines of a passport (TD3) MRZ and verify
+    the document number, birth date, expiry date and composite check digits.
+    """
+    line1 = line1.ljust(TD3_LINE_LENGTH, '<')[:TD3_LINE_LENGTH]
+    line2 = line2.ljust(TD3_LINE_LENGTH, '<')[:TD3_LINE_LENGTH]
+
+    # Positions that can only hold digits (dates and check digits)
+    chars = list(line2)
+    for i in [9, *range(13, 20), *range(21, 28), 42, 43]:
+        chars[i] = chars[i].translate(DIGIT_FIXES)
+    line2 = ''.join(chars)
+
+    number, number_check = line2[0:9], line2[9]
+    birth, birth_check = line2[13:19], line2[19]
+    expiry, expiry_check = line2[21:27], line2[27]
+    composite = line2[0:10] + line2[13:20] + line2[21:43]
+
+    checks = {
+        'documentNumber': check_digit(number) == number_check,
+        'dateOfBirth': check_digit(birth) == birth_check,
+        'dateOfExpiry': check_digit(expiry) == expiry_check,
+        'composite': check_digit(composite) == line2[43],
+    }
+
+    names = line1[5:].split('<<', 1)
+    surname = names[0].replace('<', ' ').strip()
+    given_names = names[1].replace('<', ' ').strip() if len(names) > 1 else ''
+
+    return {
+        'documentType': line1[0:2].replace('<', ''),
+        'issuingCountry': line1[2:5].replace('<', ''),
+        'surname': surname,
+        'givenNames': given_names,
+        'documentNumber': number.replace('<', ''),
+        'nationality': line2[10:13].replace('<', ''),
+        'dateOfBirth': mrz_date(birth, is_expiry=False),
+        'sex': line2[20].replace('<', ''),
+        'dateOfExpiry': mrz_date(expiry, is_expiry=True),
+        'checks': checks,
+        'valid': all(checks.values()),
+        'lines': [line1, line2],
+    }
+
+
+def find_mrz_band(gray: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Locate the MRZ: a wide block of dense dark text in the bottom part of the
+    page. Returns (x, y, w, h) or None.
+
+    The morphology kernels only merge characters and lines at a fixed scale, so
+    pages wider than MRZ_SEARCH_WIDTH are searched downscaled and the band is
+    mapped back to the page's coordinates.
+    """
+    height, width = gray.shape[:2]
+    if width <= MRZ_SEARCH_WIDTH:
+        return _find_mrz_band(gray)
+
+    scale = width / float(MRZ_SEARCH_WIDTH)
+    small = cv2.resize(gray, (MRZ_SEARCH_WIDTH, max(1, round(height / scale))), interpolation=cv2.INTER_AREA)
+    band = _find_mrz_band(small)
+    if band is None:
+        return None
+    x, y, w, h = band
+    x0, y0 = int(x * scale), int(y * scale)
+    x1, y1 = min(width, int(np.ceil((x + w) * scale))), min(height, int(np.ceil((y + h) * scale)))
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def _find_mrz_band(gray: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+    height, width = gray.shape[:2]
+    top = int(height * 0.55)
+    region = gray[top:]
+
+    # Dark text on light background stands out in a blackhat transform
+    rect_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (13, 5))
+    blackhat = cv2.morphologyEx(region, cv2.MORPH_BLACKHAT, rect_kernel)
+    gradient = cv2.Sobel(blackhat, cv2.CV_32F, 1, 0, ksize=3)
+    gradient = cv2.convertScaleAbs(gradient)
+    gradient = cv2.morphologyEx(gradient, cv2.MORPH_CLOSE, rect_kernel)
+    _, binary = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+    # Merge the characters and the two lines into one block
+    square_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (21, 21))
+    binary = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, square_kernel)
+    binary = cv2.erode(binary, None, iterations=2)
+
+    # Each MRZ line (or both, when merged) is a long, flat block. Start from
+    # the lowest one and grow upwards through closely stacked blocks.
+    contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    blocks = [cv2.boundingRect(contour) for contour in contours]
+    blocks = [(x, y, w, h) for x, y, w, h in blocks if w >= width * 0.4 and w / float(h) >= 5]
+    if not blocks:
+        return None
+    blocks.sort(key=lambda block: block[1], reverse=True)
+    x0, y0, w, h = blocks[0]
+    x1, y1 = x0 + w, y0 + h
+    for x, y, w, h in blocks[1:]:
+        if y0 - (y + h) > h * 2.5:
+            break
+        x0, y0, x1 = min(x0, x), y, max(x1, x + w)
+    if x1 - x0 < width * 0.6:
+        return None
+    best = (x0, y0, x1 - x0, y1 - y0)
+
+    x, y, w, h = best
+    pad_x, pad_y = int(w * 0.03), int(h * 0.2)
+    x0, y0 = max(0, x - pad_x), max(0, top + y - pad_y)
+    x1, y1 = min(width, x + w + pad_x), min(height, top + y + h + pad_y)
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def td3_field_boxes(band: Tuple[int, int, int, int]) -> Dict[str, Tuple[int, int, int, int]]:
+    """
+    Approximate (x, y, w, h) of each TD3_FIELD_POSITIONS field inside the MRZ
+    band: OCR-B is fixed-pitch, so a field's box follows from its character
+    positions on its line.
+    """
+    x, y, w, h = band
+    char_width, line_height = w / float(TD3_LINE_LENGTH), h / 2.0
+    return {
+        name: (int(x + first * char_width), int(y + line * line_height),
+               int((last - first) * char_width), int(line_height))
+        for name, (line, first, last) in TD3_FIELD_POSITIONS.items()
+    }
+
+
+def mrz_lines(text: str) -> List[str]:
+    lines = [re.sub(r'\s+', '', line).upper() for line in text.splitlines()]
+    return [line for line in lines if len(line) >= TD3_LINE_LENGTH - 4]
+
+
+def read_mrz(image) -> Optional[dict]:
+    """
+    OCR only the MRZ strip of a passport page and parse it.
+    Returns the parsed fields (see parse_td3) plus the MRZ's 'band' (x, y, w, h)
+    or None if no MRZ was found.
+    """
+    gray = np.asarray(image)
+    if gray.ndim == 3:
+        gray = cv2.cvtColor(gray, cv2.COLOR_RGB2GRAY)
+
+    band = find_mrz_band(gray)
+    if band is None:
+        return None
+    x, y, w, h = band
+    strip = gray[y:y + h, x:x + w]
+
+    # Two text lines: aim for roughly 40px per line of OCR input
+    if h < 80:
+        scale = 80.0 / h
+        strip = cv2.resize(strip, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+
+    text = get_engine().image_to_string(strip, lang="eng", psm=6, whitelist=MRZ_CHARS)
+    lines = mrz_lines(text)
+    if len(lines) < 2:
+        logger.debug("MRZ band found but fewer than two MRZ lines recognised")
+        return None
+    return {**parse_td3(lines[-2], lines[-1]), 'band': band}
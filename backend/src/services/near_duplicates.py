@@ -0,0 +1,166 @@
+# src/services/near_duplicates.py
+"""
+Perceptual-hash index of recently processed documents.
+
+The result cache only matches identical bytes; a card photographed again or
+re-encoded hashes differently. Here every processed image gets a 64-bit
+dHash and a 64-bit pHash of a small grayscale thumbnail, kept in fixed-size
+numpy uint64 ring buffers. A new upload within NEAR_DUPLICATE_MAX_DISTANCE
+bits (Hamming) of a recent one, on both hashes, is a candidate duplicate.
+
+Different cards printed on the same template hash closely too, so by default
+a candidate is only reused after verification: its document number has to
+be found by OCRing the text lines of the new image's field zones
+(pipeline.verify_document_number), far cheaper than the full pipeline.
+"""
+import io
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from utils.image_processing import decode_webp_gray
+
+logger = logging.getLogger(__name__)
+
+# "1" enables the index
+NEAR_DUPLICATES = os.getenv("NEAR_DUPLICATES", "1") == "1"
+NEAR_DUPLICATE_INDEX_SIZE = int(os.getenv("NEAR_DUPLICATE_INDEX_SIZE", 4096))
+# Largest Hamming distance (of 64 bits, on each hash) for a candidate
+NEAR_DUPLICATE_MAX_DISTANCE = int(os.getenv("NEAR_DUPLICATE_MAX_DISTANCE", 10))
+NEAR_DUPLICATE_TTL = int(os.getenv("NEAR_DUPLICATE_TTL", 3600))
+# "verify" checks the candidate's document number on the new image first,
+# "reuse" trusts the hashes alone
+NEAR_DUPLICATE_MODE = os.getenv("NEAR_DUPLICATE_MODE", "verify")
+
+# dHash compares neighbouring pixels of a 9x8 thumbnail; pHash thresholds
+# the low frequencies of the DCT of a 32x32 one
+DHASH_SIZE = 8
+PHASH_SIZE = 32
+PHASH_FREQUENCIES = 8
+_BIT_WEIGHTS = 1 << np.arange(64, dtype=np.uint64)
+
+
+def _pack(bits: np.ndarray) -> int:
+    """64 booleans -> uint64 value"""
+    return int(np.bitwise_or.reduce(_BIT_WEIGHTS[bits.ravel()]))
+
+
+def image_hashes(image_bytes: bytes) -> Tuple[int, int]:
+    """(dHash, pHash) of an encoded image, computed on a reduced grayscale decode."""
+    image = decode_webp_gray(image_bytes)
+    if image is None:
+        image = Image.open(io.BytesIO(image_bytes))
+        image.draft('L', (PHASH_SIZE * 2, PHASH_SIZE * 2))
+        image = image.convert('L')
+
+    small = np.asarray(image.resize((DHASH_SIZE + 1, DHASH_SIZE), Image.BILINEAR), dtype=np.int16)
+    dhash = _pack(small[:, 1:] > small[:, :-1])
+
+    pixels = np.asarray(image.resize((PHASH_SIZE, PHASH_SIZE), Image.BILINEAR), dtype=np.float32)
+    dct = cv2.dct(pixels)
+    # 8x8 lowest frequencies with the DC term (overall brightness) swapped
+    # for the next vertical one, to keep 64 bits
+    frequencies = dct[:PHASH_FREQUENCIES, :PHASH_FREQUENCIES].ravel().copy()
+    frequencies[0] = dct[PHASH_FREQUENCIES, 0]
+    phash = _pack(frequencies > np.median(frequencies))
+    return dhash, phash
+
+
+def hamming_distances(hashes: np.ndarray, value: int) -> np.ndarray:
+    xor = hashes ^ np.uint64(value)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(xor)
+    return np.unpackbits(xor.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+@dataclass(frozen=True)
+class NearDuplicate:
+    document_type: str
+    document_number: str
+    result: dict
+    distance: int
+
+
+class PerceptualHashIndex:
+    """
+    Ring buffer of the last `capacity` documents: hashes and timestamps in
+    numpy arrays (lookups are one vectorised XOR/popcount), results in a list.
+    Entries are scoped, like result cache keys, by the requested document
+    type and OCR settings.
+    """
+
+    def __init__(self, capacity: int, max_distance: int, ttl: int):
+        self.capacity = capacity
+        self.max_distance = max_distance
+        self.ttl = ttl
+        self._dhashes = np.zeros(capacity, dtype=np.uint64)
+        self._phashes = np.zeros(capacity, dtype=np.uint64)
+        self._created = np.zeros(capacity, dtype=np.float64)
+        self._entries = [None] * capacity
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.candidates = 0
+        self.hits = 0
+        self.rejected = 0
+
+    def find(self, hashes: Tuple[int, int], scope: str) -> Optional[NearDuplicate]:
+        """Closest recent document in the same scope within max_distance on both hashes."""
+        dhash, phash = hashes
+        with self._lock:
+            self.lookups += 1
+            size = self._size
+            dhash_distances = hamming_distances(self._dhashes[:size], dhash)
+            phash_distances = hamming_distances(self._phashes[:size], phash)
+            distances = dhash_distances.astype(np.int32) + phash_distances
+            matches = np.flatnonzero(
+                (dhash_distances <= self.max_distance)
+                & (phash_distances <= self.max_distance)
+                & (self._created[:size] >= time.time() - self.ttl)
+            )
+            for slot in matches[np.argsort(distances[matches], kind="stable")]:
+                entry_scope, document_type, document_number, result = self._entries[slot]
+                if entry_scope == scope:
+                    self.candidates += 1
+                    return NearDuplicate(document_type, document_number, result, int(distances[slot]))
+        return None
+
+    def add(self, hashes: Tuple[int, int], scope: str, document_type: str, document_number: str, result: dict):
+        with self._lock:
+            slot = self._next
+            self._dhashes[slot], self._phashes[slot] = hashes
+            self._created[slot] = time.time()
+            self._entries[slot] = (scope, document_type, document_number, result)
+            self._next = (slot + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def record(self, reused: bool):
+        """Outcome of a candidate: reused, or rejected by verification."""
+        with self._lock:
+            if reused:
+                self.hits += 1
+            else:
+                self.rejected += 1
+
+    def stats(self) -> dict:
+        return {
+            "enabled": NEAR_DUPLICATES,
+            "mode": NEAR_DUPLICATE_MODE,
+            "lookups": self.lookups,
+            "candidates": self.candidates,
+            "hits": self.hits,
+            "rejected": self.rejected,
+            "hitRate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "entries": self._size,
+        }
+
+
+near_duplicates = PerceptualHashIndex(NEAR_DUPLICATE_INDEX_SIZE, NEAR_DUPLICATE_MAX_DISTANCE, NEAR_DUPLICATE_TTL)
@@ -0,0 +1,341 @@
+# src/services/ocr_engine.py
+import logging
+import os
+import shlex
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# "tesserocr" keeps libtesseract loaded in-process, "pytesseract" spawns the
+# tesseract binary per call, "auto" prefers tesserocr when it is installed.
+OCR_BACKEND = os.getenv("OCR_BACKEND", "auto")
+# tesseract binary run by the pytesseract backend (main.py's MacOS default)
+TESSERACT_CMD = os.getenv("TESSERACT_CMD", "/opt/homebrew/bin/tesseract")
+# Loaded tesserocr handles kept per worker process, one per (thread, language
+# combination, oem): the ROI threads each need their own. The least recently
+# used idle handle is freed once either limit is exceeded; the memory of a
+# handle is estimated from its traineddata file sizes.
+OCR_ENGINE_CACHE_SIZE = int(os.getenv("OCR_ENGINE_CACHE_SIZE", 8))
+OCR_ENGINE_CACHE_MB = float(os.getenv("OCR_ENGINE_CACHE_MB", 256))
+# Estimate for languages whose traineddata file cannot be found
+DEFAULT_MODEL_MB = 20.0
+
+ImageInput = Union[Image.Image, np.ndarray]
+# (left, top, width, height)
+Box = Tuple[int, int, int, int]
+
+
+@dataclass(frozen=True)
+class OCRWords:
+    """
+    The words of one recognition pass as parallel columns: where each word
+    is in OCRResult.text (starts/ends, character offsets), its confidence
+    (0-100) and its box (left, top, width, height) in pixels of the OCR input.
+    """
+    starts: np.ndarray
+    ends: np.ndarray
+    confidences: np.ndarray
+    boxes: np.ndarray
+
+    @classmethod
+    def from_columns(
+        cls, starts: Sequence[int], ends: Sequence[int], confidences: Sequence[float], boxes: Sequence[Box]
+    ) -> 'OCRWords':
+        return cls(
+            np.asarray(starts, dtype=np.int32),
+            np.asarray(ends, dtype=np.int32),
+            np.asarray(confidences, dtype=np.float32),
+            np.asarray(boxes, dtype=np.int32).reshape(-1, 4),
+        )
+
+    @classmethod
+    def concat(cls, parts: List['OCRWords']) -> 'OCRWords':
+        if not parts:
+            return EMPTY_WORDS
+        return cls(*(np.concatenate(columns) for columns in zip(*(
+            (part.starts, part.ends, part.confidences, part.boxes) for part in parts
+        ))))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def shifted(self, offset: int, origin: Tuple[float, float] = (0, 0), scale: float = 1.0) -> 'OCRWords':
+        """
+        The same words after their text was placed at `offset` in a longer
+        text, with boxes mapped from a crop (upscaled by `scale`, its
+        top-left corner at `origin`) back to the full image.
+        """
+        boxes = self.boxes / scale
+        boxes[:, :2] += origin
+        return OCRWords(self.starts + offset, self.ends + offset, self.confidences, np.rint(boxes).astype(np.int32))
+
+    def locate(self, start: int, end: int) -> Optional[Tuple[float, Box]]:
+        """Mean confidence and bounding box of the words overlapping text[start:end]."""
+        index = np.flatnonzero((self.starts < end) & (self.ends > start))
+        if not len(index):
+            return None
+        boxes = self.boxes[index]
+        left, top = boxes[:, 0].min(), boxes[:, 1].min()
+        right, bottom = (boxes[:, 0] + boxes[:, 2]).max(), (boxes[:, 1] + boxes[:, 3]).max()
+        return float(self.confidences[index].mean()), (int(left), int(top), int(right - left), int(bottom - top))
+
+
+EMPTY_WORDS = OCRWords.from_columns([], [], [], [])
+
+
+@dataclass(frozen=True)
+class OCRResult:
+    text: str
+    # Mean word confidence, 0-100 (0 when nothing was recognised)
+    confidence: float
+    # Word spans, confidences and boxes from the same pass
+    words: OCRWords = EMPTY_WORDS
+
+
+class OCREngine:
+    """Common interface for the OCR backends"""
+
+    name = "base"
+
+    def image_to_string(
+        self,
+        image: ImageInput,
+        lang: str = "eng",
+        psm: int = 3,
+        oem: int = 3,
+        whitelist: Optional[str] = None
+    ) -> str:
+        raise NotImplementedError
+
+    def recognize(
+        self,
+        image: ImageInput,
+        lang: str = "eng",
+        psm: int = 3,
+        oem: int = 3,
+        whitelist: Optional[str] = None
+    ) -> OCRResult:
+        """Text, mean word confidence and per-word boxes, from the same recognition pass."""
+        raise NotImplementedError
+
+
+class PytesseractEngine(OCREngine):
+    """Runs the tesseract binary through pytesseract (one subprocess per call)"""
+
+    name = "pytesseract"
+
+    def __init__(self):
+        # Imported here, like tesserocr, so only the selected backend is loaded
+        import pytesseract
+        pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+        self._pytesseract = pytesseract
+
+    def image_to_string(self, image, lang="eng", psm=3, oem=3, whitelist=None):
+        config = f"--oem {oem} --psm {psm}"
+        if whitelist:
+            config += f" -c tessedit_char_whitelist={shlex.quote(whitelist)}"
+        return self._pytesseract.image_to_string(image, lang=lang, config=config)
+
+    def recognize(self, image, lang="eng", psm=3, oem=3, whitelist=None):
+        config = f"--oem {oem} --psm {psm}"
+        if whitelist:
+            config += f" -c tessedit_char_whitelist={shlex.quote(whitelist)}"
+        data = self._pytesseract.image_to_data(
+            image, lang=lang, config=config, output_type=self._pytesseract.Output.DICT
+        )
+
+        # Rebuild the text layout from the word rows: one line per
+        # (block, paragraph, line), a blank line between blocks
+        pieces = []
+        length = 0
+        current_line = None
+        starts, ends, confidences, boxes = [], [], [], []
+        for word, conf, block, paragraph, line, left, top, width, height in zip(
+            data["text"], data["conf"], data["block_num"], data["par_num"], data["line_num"],
+            data["left"], data["top"], data["width"], data["height"]
+        ):
+            word = word.strip()
+            if not word:
+                continue
+            if (block, paragraph, line) != current_line:
+                if current_line is not None:
+                    pieces.append("\n\n" if block != current_line[0] else "\n")
+                    length += len(pieces[-1])
+                current_line = (block, paragraph, line)
+            else:
+                pieces.append(" ")
+                length += 1
+            starts.append(length)
+            pieces.append(word)
+            length += len(word)
+            ends.append(length)
+            confidences.append(float(conf))
+            boxes.append((left, top, width, height))
+        confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        return OCRResult("".join(pieces), confidence, OCRWords.from_columns(starts, ends, confidences, boxes))
+
+
+class TesserocrEngine(OCREngine):
+    """
+    Long-lived libtesseract handles via tesserocr.
+
+    Handles are created per (lang, oem) and per thread (a handle is not
+    thread-safe), so language models are loaded once per worker thread and
+    images are passed as raw pixel buffers without going through a temp
+    file. All threads share one LRU of handles behind a lock, bounded by
+    OCR_ENGINE_CACHE_SIZE and OCR_ENGINE_CACHE_MB for the whole process, so
+    rarely used language combinations do not pin their models in memory.
+    Handles in use are never evicted.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, max_handles: int = OCR_ENGINE_CACHE_SIZE, max_mb: float = OCR_ENGINE_CACHE_MB):
+        import tesserocr
+        self._tesserocr = tesserocr
+        # (thread id, lang, oem) -> handle, least recently used first
+        self._handles: OrderedDict = OrderedDict()
+        self._in_use = set()
+        self._lock = threading.Lock()
+        self.max_handles = max_handles
+        self.max_mb = max_mb
+        self._tessdata = tesserocr.get_languages()[0]
+
+    def model_mb(self, lang: str) -> float:
+        """Approximate memory of a handle for a language combination such as "eng+hin"."""
+        total = 0.0
+        for name in lang.split("+"):
+            try:
+                total += os.path.getsize(os.path.join(self._tessdata, f"{name}.traineddata")) / (1024 * 1024)
+            except OSError:
+                total += DEFAULT_MODEL_MB
+        return total
+
+    @contextmanager
+    def _api(self, lang: str, oem: int):
+        """This thread's handle for (lang, oem), kept from eviction while in use."""
+        key: Tuple[int, str, int] = (threading.get_ident(), lang, oem)
+        with self._lock:
+            api = self._handles.get(key)
+            if api is not None:
+                self._handles.move_to_end(key)
+                self._in_use.add(key)
+        if api is None:
+            # Loading takes a while: other threads keep using the cache meanwhile
+            logger.info("Loading tesseract models for lang=%s oem=%s", lang, oem)
+            api = self._tesserocr.PyTessBaseAPI(lang=lang, oem=oem)
+            with self._lock:
+                self._handles[key] = api
+                self._in_use.add(key)
+                evicted = self._evict()
+            self._end(evicted)
+        try:
+            yield api
+        finally:
+            with self._lock:
+                self._in_use.discard(key)
+                evicted = self._evict()
+            self._end(evicted)
+
+    def _evict(self) -> List[tuple]:
+        """Remove idle handles, least recently used first, until within the limits. Call with the lock held."""
+        evicted = []
+        total_mb = sum(self.model_mb(lang) for _, lang, _ in self._handles)
+        for key in list(self._handles):
+            if len(self._handles) <= self.max_handles and total_mb <= self.max_mb:
+                break
+            if key in self._in_use:
+                continue
+            evicted.append((key, self._handles.pop(key)))
+            total_mb -= self.model_mb(key[1])
+        return evicted
+
+    def _end(self, evicted: List[tuple]):
+        for (_, lang, oem), api in evicted:
+            logger.info("Unloading tesseract models for lang=%s oem=%s", lang, oem)
+            api.End()
+
+    def _set_image(self, api, image: ImageInput):
+        if isinstance(image, Image.Image):
+            if image.mode not in ("L", "RGB"):
+                image = image.convert("RGB")
+            image = np.asarray(image)
+        image = np.ascontiguousarray(image)
+        height, width = image.shape[:2]
+        bytes_per_pixel = 1 if image.ndim == 2 else image.shape[2]
+        api.SetImageBytes(image.tobytes(), width, height, bytes_per_pixel, width * bytes_per_pixel)
+
+    def image_to_string(self, image, lang="eng", psm=3, oem=3, whitelist=None):
+        with self._api(lang, oem) as api:
+            api.SetPageSegMode(psm)
+            api.SetVariable("tessedit_char_whitelist", whitelist or "")
+            self._set_image(api, image)
+            try:
+                return api.GetUTF8Text()
+            finally:
+                api.Clear()
+
+    def recognize(self, image, lang="eng", psm=3, oem=3, whitelist=None):
+        with self._api(lang, oem) as api:
+            api.SetPageSegMode(psm)
+            api.SetVariable("tessedit_char_whitelist", whitelist or "")
+            self._set_image(api, image)
+            try:
+                text = api.GetUTF8Text()
+                # Computed from the recognition GetUTF8Text already ran
+                return OCRResult(text, float(max(api.MeanTextConf(), 0)), self._words(api, text))
+            finally:
+                api.Clear()
+
+    def _words(self, api, text: str) -> OCRWords:
+        """Word boxes and confidences of the last recognition, located in its text."""
+        level = self._tesserocr.RIL.WORD
+        iterator = api.GetIterator()
+        if iterator is None:
+            return EMPTY_WORDS
+        starts, ends, confidences, boxes = [], [], [], []
+        position = 0
+        for word_iterator in self._tesserocr.iterate_level(iterator, level):
+            word = (word_iterator.GetUTF8Text(level) or "").strip()
+            box = word_iterator.BoundingBox(level)
+            start = text.find(word, position) if word else -1
+            if start < 0 or box is None:
+                continue
+            left, top, right, bottom = box
+            position = start + len(word)
+            starts.append(start)
+            ends.append(position)
+            confidences.append(word_iterator.Confidence(level))
+            boxes.append((left, top, right - left, bottom - top))
+        return OCRWords.from_columns(starts, ends, confidences, boxes)
+
+
+_engine: Optional[OCREngine] = None
+
+
+def get_engine() -> OCREngine:
+    """Return the OCR engine for this process, creating it on first use."""
+    global _engine
+    if _engine is None:
+        _engine = create_engine(OCR_BACKEND)
+    return _engine
+
+
+def create_engine(backend: str) -> OCREngine:
+    backend = backend.lower()
+    if backend in ("tesserocr", "auto"):
+        try:
+            return TesserocrEngine()
+        except ImportError:
+            if backend == "tesserocr":
+                logger.warning("tesserocr is not installed, falling back to pytesseract")
+    elif backend != "pytesseract":
+        raise ValueError(f"Unknown OCR backend: {backend}")
+    return PytesseractEngine()
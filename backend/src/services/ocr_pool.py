@@ -0,0 +1,118 @@
+# src/services/ocr_pool.py
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from utils.logging_config import configure_logging, logging_configured
+from utils.profiler import profile_call, profiler
+
+logger = logging.getLogger(__name__)
+
+# Pool sizing. Each worker runs one decode -> preprocess -> OCR job at a time,
+# so OCR_POOL_WORKERS is normally the number of physical cores available.
+OCR_POOL_WORKERS = int(os.getenv("OCR_POOL_WORKERS", os.cpu_count() or 1))
+# How many jobs may wait for a free worker before new requests are rejected
+OCR_POOL_QUEUE_SIZE = int(os.getenv("OCR_POOL_QUEUE_SIZE", OCR_POOL_WORKERS * 2))
+# Value sent in the Retry-After header when the queue is full
+OCR_POOL_RETRY_AFTER = int(os.getenv("OCR_POOL_RETRY_AFTER", 5))
+
+
+class OCRPoolBusyError(Exception):
+    """Raised when the OCR worker pool queue is full"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("OCR worker pool is busy, retry later")
+        self.retry_after = retry_after
+
+
+def _init_worker(initializer: Optional[Callable[[], None]], configure: bool):
+    """
+    Pool initializer. Forked workers inherit the parent's logging setup, but
+    spawned ones (the default start method on macOS) start with none, and
+    their records would be dropped: configure it when the parent did.
+    """
+    if configure:
+        configure_logging()
+    if initializer is not None:
+        initializer()
+
+
+class OCRWorkerPool:
+    """
+    Process pool for CPU-bound OCR work with a bounded queue.
+
+    Jobs are plain module-level functions (they must be picklable). At most
+    `workers + queue_size` jobs are admitted at once; beyond that `run` raises
+    OCRPoolBusyError unless the caller asks to wait for a slot.
+    """
+
+    def __init__(self, workers: int, queue_size: int, retry_after: int, initializer: Optional[Callable[[], None]] = None):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.retry_after = retry_after
+        # Run by every worker process before its first job (services/warmup.py)
+        self.initializer = initializer
+        self.pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.queue_size
+
+    @property
+    def in_flight(self) -> int:
+        return min(self.pending, self.workers)
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self.pending - self.workers)
+
+    def _ensure_started(self):
+        if self._executor is None:
+            logger.info("Starting OCR pool with %d workers, queue size %d", self.workers, self.queue_size)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker,
+                initargs=(self.initializer, logging_configured()),
+            )
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.capacity)
+
+    async def run(self, fn: Callable[..., Any], *args, wait: bool = False) -> Any:
+        """Run fn(*args) in a worker process and return its result."""
+        self._ensure_started()
+        if not wait and self._slots.locked():
+            raise OCRPoolBusyError(self.retry_after)
+
+        async with self._slots:
+            self.pending += 1
+            try:
+                loop = asyncio.get_running_loop()
+                if profiler.active:
+                    # Sample the job inside the worker and fold its stacks into ours
+                    result, stacks = await loop.run_in_executor(
+                        self._executor, profile_call, fn, profiler.interval, *args
+                    )
+                    profiler.merge(stacks)
+                    return result
+                return await loop.run_in_executor(self._executor, fn, *args)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed); start a fresh pool for the next job
+                logger.error("OCR worker pool broke, restarting it")
+                self._executor = None
+                self._ensure_started()
+                raise
+            finally:
+                self.pending -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._slots = None
+
+
+ocr_pool = OCRWorkerPool(OCR_POOL_WORKERS, OCR_POOL_QUEUE_SIZE, OCR_POOL_RETRY_AFTER)
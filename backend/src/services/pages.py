@@ -0,0 +1,132 @@
+# src/services/pages.py
+"""
+Page-level access to multi-page uploads (PDF, multi-frame TIFF).
+
+A Page is only a (path, index) reference, cheap to send to an OCR pool
+worker; the worker renders or decodes that one page when the pipeline asks
+for it. PDF pages are rasterized at OCR_TARGET_DPI (pypdfium2), TIFF frames
+are read by seeking to them, so no page is decoded ahead of its job. Either
+way a page bitmap never exceeds PAGE_MAX_PIXELS, whatever the file claims.
+"""
+import logging
+import math
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from PIL import Image
+
+from utils.image_processing import OCR_TARGET_DPI
+
+logger = logging.getLogger(__name__)
+
+# PDF user space units per inch
+PDF_POINTS_PER_INCH = 72
+# Largest page bitmap (pixels) handed to the pipeline: PDF pages are rendered
+# at most this large, TIFF frames are reduced to it after decoding. Frames of
+# more than PAGE_MAX_DECODE_PIXELS are refused before decoding.
+PAGE_MAX_PIXELS = int(os.getenv("PAGE_MAX_PIXELS", 25_000_000))
+PAGE_MAX_DECODE_PIXELS = int(os.getenv("PAGE_MAX_DECODE_PIXELS", 4 * PAGE_MAX_PIXELS))
+
+
+class PageError(Exception):
+    """The upload cannot be split into pages"""
+
+
+@dataclass(frozen=True)
+class Page:
+    path: str
+    # "pdf", "tiff", or a single-frame image format
+    format: str
+    index: int
+
+    def decode(self, max_dimension: Optional[int] = None, mode: str = 'L') -> Image.Image:
+        """
+        Render/decode this page to 8-bit grayscale (or `mode`), at most
+        max_dimension pixels on its longer side.
+        """
+        if self.format == "pdf":
+            return render_pdf_page(self.path, self.index, max_dimension, mode)
+        return decode_frame(self.path, self.index, max_dimension, mode)
+
+
+def render_pdf_page(path: str, index: int, max_dimension: Optional[int] = None, mode: str = 'L') -> Image.Image:
+    import pypdfium2
+
+    document = pypdfium2.PdfDocument(path)
+    try:
+        page = document[index]
+        width, height = page.get_size()
+        scale = OCR_TARGET_DPI / PDF_POINTS_PER_INCH
+        if max_dimension:
+            scale = min(scale, max_dimension / max(width, height))
+        # A PDF page can be up to 200 x 200 inches
+        scale = min(scale, math.sqrt(PAGE_MAX_PIXELS / (width * height)))
+        image = page.render(scale=scale, grayscale=mode == 'L').to_pil()
+        page.close()
+    finally:
+        document.close()
+
+    if image.mode != mode:
+        image = image.convert(mode)
+    image.info['dpi'] = (scale * PDF_POINTS_PER_INCH,) * 2
+    return image
+
+
+def decode_frame(path: str, index: int, max_dimension: Optional[int] = None, mode: str = 'L') -> Image.Image:
+    """Decode one frame of a (multi-frame) image file, e.g. a TIFF page."""
+    with Image.open(path) as frames:
+        frames.seek(index)
+        if frames.width * frames.height > PAGE_MAX_DECODE_PIXELS:
+            raise PageError(f"Page {index} is too large: {frames.width}x{frames.height} pixels")
+        image = frames.convert(mode) if frames.mode != mode else frames.copy()
+        dpi = frames.info.get('dpi')
+    width = image.width
+    pixel_scale = math.sqrt(PAGE_MAX_PIXELS / (image.width * image.height))
+    if pixel_scale < 1:
+        limit = int(max(image.size) * pixel_scale)
+        max_dimension = min(max_dimension, limit) if max_dimension else limit
+    if max_dimension and max(image.size) > max_dimension:
+        image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+        if dpi:
+            ratio = image.width / float(width)
+            dpi = (dpi[0] * ratio, dpi[1] * ratio)
+    if dpi:
+        image.info['dpi'] = dpi
+    return image
+
+
+def open_pages(path: str, file_format: str) -> List[Page]:
+    """
+    List the pages of a PDF or TIFF (any other image is a single page)
+    without rendering or decoding any of them.
+    """
+    try:
+        if file_format == "pdf":
+            import pypdfium2
+            document = pypdfium2.PdfDocument(path)
+            count = len(document)
+            document.close()
+        else:
+            with Image.open(path) as frames:
+                count = getattr(frames, "n_frames", 1)
+    except Exception as e:
+        raise PageError(f"Cannot read {file_format} pages: {e}")
+    logger.debug("Upload has %d %s pages", count, file_format)
+    return [Page(path, file_format, index) for index in range(count)]
+
+
+def spool_pages(contents: bytes, file_format: str) -> Tuple[str, List[Page]]:
+    """
+    Write an upload to a temporary file for the workers to render pages from
+    and list its pages; returns (path, pages). Blocking: run it in a thread.
+    The caller deletes the file, unless PageError is raised.
+    """
+    with tempfile.NamedTemporaryFile(suffix=f".{file_format}", delete=False) as upload:
+        upload.write(contents)
+    try:
+        return upload.name, open_pages(upload.name, file_format)
+    except PageError:
+        os.unlink(upload.name)
+        raise
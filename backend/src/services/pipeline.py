@@ -0,0 +1,636 @@
+# src/services/pipeline.py
+"""
+The document pipeline shared by every endpoint:
+
+    decode -> preprocess -> OCR -> extract -> validate
+
+Document types are registered in DOCUMENT_TYPES with their preprocessing,
+OCR settings, field spec (services/field_extraction.py), validation rules
+and response format. The stages run in an OCR pool worker; result caching,
+metrics and logging wrap them in process_document_bytes.
+"""
+import asyncio
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
+
+from PIL import Image
+
+from services.classifier import CLASSIFIER_THUMBNAIL_SIZE, classify_image, load_thumbnail
+from services.field_extraction import ParsedDate, Span, extract_fields
+from services.metrics import count_document, record_stages
+from services.near_duplicates import NEAR_DUPLICATE_MODE, NEAR_DUPLICATES, image_hashes, near_duplicates
+from services.mrz import read_mrz, td3_field_boxes
+from services.ocr_engine import OCRResult, get_engine
+from services.ocr_pool import OCR_POOL_WORKERS, ocr_pool, OCRPoolBusyError
+from services.pages import Page
+from services.result_cache import cache_key, result_cache
+from services.roi_ocr import find_in_text_regions, ocr_text_regions, roi_enabled
+from utils.image_processing import (
+    OCR_MAX_DIMENSION, PREPROCESS_PROFILES, decode_dimension, decode_image, downscale_for_ocr, enhance_contrast,
+    process_gray_image
+)
+from utils.logging_config import debug_request
+from utils.timing import StageTimer
+
+logger = logging.getLogger(__name__)
+
+# Mean word confidence (0-100) below which a document type's fallback_lang
+# pass is run
+OCR_FALLBACK_CONFIDENCE = float(os.getenv("OCR_FALLBACK_CONFIDENCE", 70))
+# A valid document whose fields were all read with at least this confidence
+# is accepted without trying the heavier escalation steps
+OCR_ACCEPT_CONFIDENCE = float(os.getenv("OCR_ACCEPT_CONFIDENCE", 80))
+# Wall-clock budget per document; escalation steps that would not finish in
+# time are skipped (the first attempt always runs)
+OCR_TIME_BUDGET_MS = float(os.getenv("OCR_TIME_BUDGET_MS", 10000))
+# Pages of one multi-page upload OCRed at once; the rest of the pool's
+# slots stay free for other requests
+PAGES_MAX_IN_FLIGHT = int(os.getenv("PAGES_MAX_IN_FLIGHT", OCR_POOL_WORKERS))
+
+
+class UnsupportedDocumentType(ValueError):
+    """Raised for document types that are not registered"""
+
+
+class UnrecognizedDocument(Exception):
+    """Raised when documentType=auto cannot tell what the document is"""
+
+
+# Preprocessor name -> (largest dimension worth decoding, grayscale image -> OCR input)
+PREPROCESSORS: Dict[str, Tuple[Optional[int], Callable[[Image.Image], Image.Image]]] = {
+    # Downscale-only resize, the cheapest option
+    'downscale': (OCR_MAX_DIMENSION, downscale_for_ocr),
+    # Full resolution with a contrast boost
+    'contrast': (None, enhance_contrast),
+    # OpenCV pipelines (utils/image_processing.py profiles)
+    **{
+        name: (profile.max_dimension, lambda image, profile=profile: process_gray_image(image, profile))
+        for name, profile in PREPROCESS_PROFILES.items()
+    },
+}
+
+
+# documentType value that asks for classification (services/classifier.py)
+AUTO = 'auto'
+
+# Heavier (preprocessor, page segmentation mode) steps tried, in order, while
+# the document is invalid or read with low confidence: the OpenCV pipeline,
+# then the same image as a single uniform block of text
+DEFAULT_ESCALATION: Tuple[Tuple[str, int], ...] = (('balanced', 3), ('balanced', 6))
+
+
+def pan_card_result(document_type: 'DocumentType', fields: dict, is_valid: bool, sources: Dict[str, dict]) -> dict:
+    """Response of POST /api/process-document/ for PAN cards (dates as printed)."""
+    date_of_birth = fields.get('dateOfBirth')
+    return {
+        'documentType': document_type.name,
+        'documentNumber': fields.get('documentNumber', ''),
+        'fullName': fields.get('fullName', ''),
+        'fatherName': fields.get('fatherName', ''),
+        'dateOfBirth': date_of_birth.raw if date_of_birth else '',
+        'isValid': is_valid,
+        'fieldSources': {
+            name: source for name, source in sources.items()
+            if name in ('documentNumber', 'fullName', 'fatherName', 'dateOfBirth')
+        },
+    }
+
+
+def document_data_result(document_type: 'DocumentType', fields: dict, is_valid: bool, sources: Dict[str, dict]) -> dict:
+    """services.document_processor.DocumentData fields (dates as YYYY-MM-DD)."""
+    def iso(name: str) -> Optional[str]:
+        return fields[name].iso if fields.get(name) else None
+
+    return {
+        'documentType': document_type.name.upper(),
+        'documentNumber': fields.get('documentNumber', ''),
+        'fullName': fields.get('fullName', ''),
+        'fathersName': fields.get('fatherName'),
+        'dateOfBirth': iso('dateOfBirth'),
+        'dateOfIssue': iso('dateOfIssue'),
+        'dateOfExpiry': iso('dateOfExpiry'),
+        'isValid': is_valid,
+        'fieldSources': {
+            'fathersName' if name == 'fatherName' else name: source for name, source in sources.items()
+        },
+    }
+
+
+@dataclass(frozen=True)
+class DocumentType:
+    """Everything the pipeline needs to know about one kind of document"""
+    name: str
+    # Field spec name in services.field_extraction.DOCUMENT_SPECS
+    fields: str
+    preprocess: str = 'downscale'
+    # Smallest language set that covers the fields...
+    lang: str = 'eng'
+    # ...and the larger one for a second pass when the first one is unsure
+    fallback_lang: Optional[str] = None
+    psm: int = 3
+    oem: int = 3
+    # Try the passport MRZ before any other OCR
+    mrz: bool = False
+    # A document is valid when all of these were extracted...
+    required_fields: Tuple[str, ...] = ('documentNumber',)
+    # ...and, if set, its dateOfExpiry lies in the future
+    check_expiry: bool = False
+    # (preprocess, psm) steps after the first attempt, see DEFAULT_ESCALATION
+    escalation: Tuple[Tuple[str, int], ...] = DEFAULT_ESCALATION
+    # Classification hints (documentType=auto). Thumbnail: long/short side
+    # ratio and background hue in degrees (an MRZ is a hint when mrz is set)...
+    aspect_ratio: Optional[Tuple[float, float]] = None
+    background_hue: Optional[Tuple[float, float]] = None
+    # ...and, when the thumbnail is inconclusive, a regex for the OCR text
+    signature: Optional[str] = None
+    result: Callable[['DocumentType', dict, bool, Dict[str, dict]], dict] = document_data_result
+
+    @property
+    def ocr_config(self) -> str:
+        """Everything that changes the OCR output; part of the result cache key"""
+        return (
+            f"lang={self.lang} fallback_lang={self.fallback_lang} psm={self.psm} oem={self.oem} "
+            f"preprocess={self.preprocess} escalation={self.escalation}"
+        )
+
+
+DOCUMENT_TYPES: Dict[str, DocumentType] = {}
+
+
+def register_document_type(document_type: DocumentType):
+    for preprocess in (document_type.preprocess, *(step for step, _ in document_type.escalation)):
+        if preprocess not in PREPROCESSORS:
+            raise ValueError(f"Unknown preprocessor: {preprocess}")
+    DOCUMENT_TYPES[document_type.name] = document_type
+
+
+def is_document_type(name: str) -> bool:
+    """Registered type or "auto"."""
+    return name.lower() == AUTO or name.lower() in DOCUMENT_TYPES
+
+
+def get_document_type(name: str) -> DocumentType:
+    document_type = DOCUMENT_TYPES.get(name.lower())
+    if document_type is None:
+        raise UnsupportedDocumentType(f"Unsupported document type: {name}")
+    return document_type
+
+
+# POST /api/process-document/ PAN cards
+register_document_type(DocumentType(
+    'pan_card', fields='pan_card', preprocess='downscale',
+    required_fields=('documentNumber', 'fullName', 'dateOfBirth'),
+    result=pan_card_result,
+    # ID-1 card on a light blue background
+    aspect_ratio=(1.45, 1.75), background_hue=(180, 250),
+    signature=r'INCOME\s*TAX|PERMANENT\s*ACCOUNT|\b[A-Z]{5}[0-9]{4}[A-Z]\b',
+))
+# api/routes.py documents. PAN fields are printed in Latin script; the Hindi
+# model is only loaded for cards the English pass cannot read confidently.
+register_document_type(DocumentType('pan', fields='pan', preprocess='contrast', fallback_lang='eng+hin'))
+register_document_type(DocumentType(
+    'passport', fields='passport', preprocess='contrast', mrz=True,
+    required_fields=('documentNumber', 'dateOfExpiry'), check_expiry=True,
+    # TD3 data page (125 x 88 mm)
+    aspect_ratio=(1.25, 1.6),
+    signature=r'PASSPORT|P<[A-Z<]{3}',
+))
+
+# Documents the thumbnail classifier cannot place are first read like this
+# type, whose first attempt is the cheapest, and classified from that text
+CLASSIFY_PROBE_TYPE = 'pan_card'
+
+
+
+def classify_text(text: str) -> Optional[DocumentType]:
+    """First registered type whose signature occurs in the OCR text."""
+    for document_type in DOCUMENT_TYPES.values():
+        if document_type.signature and re.search(document_type.signature, text, re.IGNORECASE):
+            return document_type
+    return None
+
+
+def mrz_fields(mrz: dict) -> dict:
+    fields = {
+        'documentNumber': mrz['documentNumber'],
+        'fullName': f"{mrz['givenNames']} {mrz['surname']}".strip(),
+    }
+    for name in ('dateOfBirth', 'dateOfExpiry'):
+        if mrz[name]:
+            fields[name] = ParsedDate(mrz[name], mrz[name])
+    return fields
+
+
+def has_required_fields(document_type: DocumentType, fields: dict) -> bool:
+    return all(fields.get(name) for name in document_type.required_fields)
+
+
+def validate(document_type: DocumentType, fields: dict) -> bool:
+    if not has_required_fields(document_type, fields):
+        return False
+    if document_type.check_expiry:
+        expiry = fields.get('dateOfExpiry')
+        return bool(expiry) and datetime.strptime(expiry.iso, "%Y-%m-%d") > datetime.now()
+    return True
+
+
+def page_box(box: Tuple[int, int, int, int], size: Tuple[int, int]) -> List[float]:
+    """Pixel (x, y, w, h) on the OCR input -> fractions of its width and height."""
+    width, height = size
+    x, y, w, h = box
+    return [round(x / width, 4), round(y / height, 4), round(w / width, 4), round(h / height, 4)]
+
+
+def field_sources(ocr: OCRResult, spans: Dict[str, Span], size: Tuple[int, int]) -> Dict[str, dict]:
+    """
+    Confidence and box of each extracted field, from the OCR words under its
+    text span. Boxes are [x, y, width, height] as fractions of the page, so
+    they apply to the upload at any resolution (for deskewed images they are
+    in the straightened frame). Without words, a field gets the pass's
+    confidence and no box.
+    """
+    sources = {}
+    for name, (start, end) in spans.items():
+        located = ocr.words.locate(start, end)
+        if located is None:
+            sources[name] = {'confidence': round(ocr.confidence, 1), 'box': None}
+        else:
+            confidence, box = located
+            sources[name] = {'confidence': round(confidence, 1), 'box': page_box(box, size)}
+    return sources
+
+
+def ocr_and_extract(
+    image: Image.Image, document_type: DocumentType, timer: StageTimer
+) -> Tuple[OCRResult, dict, Dict[str, dict]]:
+    """
+    OCR stage plus field extraction, cheapest reader first: the MRZ (check
+    digits verified), then field text lines, then the full page (again with
+    fallback_lang if the first pass's confidence is low). Returns the OCR
+    result, the fields and each field's confidence and box (field_sources),
+    all from the same OCR pass.
+    """
+    size = image.size
+    spans: Dict[str, Span] = {}
+    if document_type.mrz:
+        with timer.stage("mrz"):
+            mrz = read_mrz(image)
+        if mrz and mrz['valid']:
+            # Check digits verified: as certain as this pipeline gets
+            fields = mrz_fields(mrz)
+            boxes = td3_field_boxes(mrz['band'])
+            sources = {name: {'confidence': 100.0, 'box': page_box(boxes[name], size)} for name in fields}
+            return OCRResult("\n".join(mrz['lines']), 100.0), fields, sources
+        logger.info("MRZ missing or check digits failed, falling back to full-page OCR")
+
+    if roi_enabled():
+        with timer.stage("roi_ocr"):
+            ocr = ocr_text_regions(image, document_type.name, lang=document_type.lang)
+        with timer.stage("extract"):
+            fields = extract_fields(ocr.text, document_type.fields, spans)
+            sources = field_sources(ocr, spans, size)
+        if has_required_fields(document_type, fields) and ocr.confidence >= OCR_ACCEPT_CONFIDENCE:
+            return ocr, fields, sources
+        spans.clear()
+
+    engine = get_engine()
+    with timer.stage("ocr"):
+        ocr = engine.recognize(image, lang=document_type.lang, psm=document_type.psm, oem=document_type.oem)
+    if document_type.fallback_lang and ocr.confidence < OCR_FALLBACK_CONFIDENCE:
+        logger.info(
+            "OCR confidence %.1f with lang=%s, retrying with lang=%s",
+            ocr.confidence, document_type.lang, document_type.fallback_lang
+        )
+        with timer.stage("ocr_fallback"):
+            retry = engine.recognize(
+                image, lang=document_type.fallback_lang, psm=document_type.psm, oem=document_type.oem
+            )
+        if retry.confidence > ocr.confidence:
+            ocr = retry
+    with timer.stage("extract"):
+        fields = extract_fields(ocr.text, document_type.fields, spans)
+        sources = field_sources(ocr, spans, size)
+    return ocr, fields, sources
+
+
+def decode_source(source: Union[bytes, Page], max_dimension: Optional[int]) -> Image.Image:
+    """Decode an uploaded image, or render/decode one page of a multi-page upload."""
+    if isinstance(source, Page):
+        return source.decode(max_dimension)
+    return decode_image(source, max_dimension)
+
+
+def accepted(document_type: DocumentType, fields: dict, sources: Dict[str, dict]) -> bool:
+    """Valid, with every required field read at OCR_ACCEPT_CONFIDENCE or better: no escalation needed."""
+    return validate(document_type, fields) and all(
+        sources[name]['confidence'] >= OCR_ACCEPT_CONFIDENCE for name in document_type.required_fields
+    )
+
+
+@dataclass
+class StageProgress:
+    """
+    What run_stages has done so far for one document: the steps attempted,
+    the merged fields and their sources, the most confident OCR pass and the
+    decoded images. Passing it to a second run_stages call for the same
+    document and type resumes the escalation instead of starting over.
+    """
+    started: float = field(default_factory=time.perf_counter)
+    attempts: int = 0
+    last_duration: float = 0.0
+    fields: dict = field(default_factory=dict)
+    sources: Dict[str, dict] = field(default_factory=dict)
+    best: Optional[OCRResult] = None
+    decoded: Dict[Optional[int], Image.Image] = field(default_factory=dict)
+
+
+def run_stages(
+    source: Union[bytes, Page], document_type: DocumentType, time_budget_ms: float = OCR_TIME_BUDGET_MS,
+    progress: Optional[StageProgress] = None,
+) -> Tuple[dict, Dict[str, dict], str, StageTimer]:
+    """
+    decode -> preprocess -> OCR -> extract; returns (fields, field sources,
+    text, timer).
+
+    Starts with the document type's own (cheapest) preprocessor and PSM and
+    stops as soon as the document validates with every required field read
+    at OCR_ACCEPT_CONFIDENCE or better. Otherwise the escalation steps run
+    in order, within time_budget_ms, skipping any that repeat an earlier
+    step. Fields from a later step only replace missing ones or ones read
+    with lower confidence.
+
+    With `progress` from an earlier call, the steps it attempted are not run
+    again and the budget counts from its first step; it is updated in place.
+    """
+    timer = StageTimer()
+    if progress is None:
+        progress = StageProgress()
+    deadline = progress.started + time_budget_ms / 1000
+    steps: Tuple[Tuple[str, int], ...] = ()
+    for step in ((document_type.preprocess, document_type.psm), *document_type.escalation):
+        # A classified type may already start at an escalation step
+        if step not in steps:
+            steps += (step,)
+    decoded = progress.decoded
+    fields = progress.fields
+    sources = progress.sources
+
+    for attempt in range(progress.attempts, len(steps)):
+        preprocess_name, psm = steps[attempt]
+        step_started = time.perf_counter()
+        if attempt:
+            if step_started + progress.last_duration > deadline:
+                logger.info("Time budget spent after %d OCR attempt(s), skipping escalation", attempt)
+                break
+            logger.info("Escalating to preprocess=%s psm=%s", preprocess_name, psm)
+
+        step_type = replace(document_type, preprocess=preprocess_name, psm=psm)
+        max_dimension, preprocess = PREPROCESSORS[preprocess_name]
+        if not isinstance(source, Page):
+            # Steps share one decode when max_dimension does not change it,
+            # e.g. for a PNG/WebP shrunk by the client (GET /api/capabilities)
+            max_dimension = decode_dimension(source, max_dimension)
+        with timer.stage("decode"):
+            if max_dimension not in decoded:
+                decoded[max_dimension] = decode_source(source, max_dimension)
+        with timer.stage("preprocess"):
+            image = preprocess(decoded[max_dimension])
+        ocr, step_fields, step_sources = ocr_and_extract(image, step_type, timer)
+
+        for name, value in step_fields.items():
+            if value and (not fields.get(name) or step_sources[name]['confidence'] > sources[name]['confidence']):
+                fields[name] = value
+                sources[name] = step_sources[name]
+        if progress.best is None or ocr.confidence > progress.best.confidence:
+            progress.best = ocr
+        progress.attempts = attempt + 1
+        progress.last_duration = time.perf_counter() - step_started
+
+        if accepted(document_type, fields, sources):
+            break
+
+    return fields, sources, progress.best.text, timer
+
+
+def classify_and_run(source: Union[bytes, Page]) -> Tuple[Optional[DocumentType], dict, Dict[str, dict], str, StageTimer]:
+    """
+    documentType=auto: pick the type (and preprocessing) from a thumbnail in
+    milliseconds. When the thumbnail is inconclusive, fall back to classifying
+    the text of a cheap first pass; when the probe type matches, its
+    escalation resumes after that pass.
+    """
+    timer = StageTimer()
+    with timer.stage("classify"):
+        if isinstance(source, Page):
+            thumbnail = source.decode(CLASSIFIER_THUMBNAIL_SIZE, mode='RGB')
+        else:
+            thumbnail = load_thumbnail(source)
+        classification = classify_image(thumbnail, DOCUMENT_TYPES.values())
+        del thumbnail
+    if classification is not None:
+        config = replace(DOCUMENT_TYPES[classification.document_type], preprocess=classification.preprocess)
+        fields, sources, text, stage_timer = run_stages(source, config)
+        timer.merge(stage_timer.stages)
+        return config, fields, sources, text, timer
+
+    probe = DOCUMENT_TYPES[CLASSIFY_PROBE_TYPE]
+    progress = StageProgress()
+    # Zero budget: first attempt only
+    fields, sources, text, probe_timer = run_stages(source, probe, time_budget_ms=0, progress=progress)
+    timer.merge(probe_timer.stages)
+    with timer.stage("classify"):
+        config = classify_text(text)
+    if config is probe:
+        if not accepted(probe, fields, sources):
+            fields, sources, text, stage_timer = run_stages(source, probe, progress=progress)
+            timer.merge(stage_timer.stages)
+    elif config is not None:
+        fields, sources, text, stage_timer = run_stages(source, config)
+        timer.merge(stage_timer.stages)
+    return config, fields, sources, text, timer
+
+
+def run_pipeline(source: Union[bytes, Page], document_type: str) -> Tuple[str, dict, str, Dict[str, float]]:
+    """
+    The whole pipeline for one image or page. Runs inside an OCR pool worker,
+    returns (document type, result, OCR text, stage timings).
+    """
+    if document_type.lower() == AUTO:
+        config, fields, sources, text, timer = classify_and_run(source)
+        if config is None:
+            raise UnrecognizedDocument("Could not determine the document type")
+    else:
+        config = get_document_type(document_type)
+        fields, sources, text, timer = run_stages(source, config)
+    with timer.stage("validate"):
+        result = config.result(config, fields, validate(config, fields), sources)
+    return config.name, result, text, timer.stages
+
+
+def verify_document_number(image_bytes: bytes, document_type: str, document_number: str) -> bool:
+    """
+    Whether a near-duplicate candidate's document number is on this image:
+    line crops of the field zones, or the cheapest full-page pass for types
+    without zones. Runs inside an OCR pool worker; only used when ROI OCR is
+    enabled (near_duplicates_enabled).
+    """
+    config = get_document_type(document_type)
+    max_dimension, preprocess = PREPROCESSORS[config.preprocess]
+    image = preprocess(decode_image(image_bytes, max_dimension))
+    found = find_in_text_regions(image, config.name, document_number, lang=config.lang)
+    if found is None:
+        text = get_engine().image_to_string(image, lang=config.lang, psm=config.psm, oem=config.oem)
+        found = "".join(document_number.split()).upper() in "".join(text.split()).upper()
+    return found
+
+
+def near_duplicates_enabled() -> bool:
+    """
+    Whether a lookup can pay off. In verify mode a candidate costs the line
+    crops of verify_document_number, cheap only with ROI OCR: with
+    pytesseract every crop is a tesseract subprocess and verifying costs
+    several times the full pipeline.
+    """
+    return NEAR_DUPLICATES and (NEAR_DUPLICATE_MODE == "reuse" or roi_enabled())
+
+
+async def find_near_duplicate(image_bytes: bytes, scope: str, wait: bool) -> Tuple[Optional[tuple], Optional[dict]]:
+    """
+    Look the upload up in the perceptual-hash index. Returns its hashes (to
+    index it after OCR) and the result of a verified near-duplicate, if any.
+    """
+    try:
+        hashes = await asyncio.to_thread(image_hashes, image_bytes)
+    except Exception as e:
+        logger.debug("Cannot hash upload: %s", e)
+        return None, None
+    match = near_duplicates.find(hashes, scope)
+    if match is None:
+        return hashes, None
+
+    reused = NEAR_DUPLICATE_MODE == "reuse" or await ocr_pool.run(
+        verify_document_number, image_bytes, match.document_type, match.document_number, wait=wait
+    )
+    near_duplicates.record(reused)
+    logger.info(
+        "Near-duplicate at distance %d %s", match.distance, "reused" if reused else "rejected by verification"
+    )
+    return hashes, match.result if reused else None
+
+
+async def stream_pages(
+    pages: List[Page], document_type: str = AUTO, max_in_flight: int = PAGES_MAX_IN_FLIGHT
+) -> AsyncIterator[dict]:
+    """
+    OCR the pages in parallel across the worker pool and yield one dict per
+    page as soon as it finishes (completion order). Pages are only
+    references; each is rendered inside its worker job. At most
+    max_in_flight pages hold a pool slot at once, so a long document leaves
+    room for interactive requests.
+    """
+    async def run(page: Page) -> dict:
+        started = time.perf_counter()
+        try:
+            name, result, _, stages = await ocr_pool.run(run_pipeline, page, document_type, wait=True)
+        except UnrecognizedDocument:
+            count_document(document_type, "unrecognized")
+            return {"page": page.index, "pageCount": len(pages), "status": "unclassified", "documentType": None}
+        except Exception as e:
+            logger.error("Page %d failed: %s", page.index, e)
+            count_document(document_type, "error")
+            return {"page": page.index, "pageCount": len(pages), "status": "error", "error": str(e)}
+        stages["queue"] = max(0.0, time.perf_counter() - started - sum(stages.values()))
+        record_stages(name, stages)
+        count_document(name, "ok")
+        return {"page": page.index, "pageCount": len(pages), "status": "ok", "documentType": name, "result": result}
+
+    remaining = iter(pages)
+    pending = set()
+    try:
+        while True:
+            for page in remaining:
+                pending.add(asyncio.ensure_future(run(page)))
+                if len(pending) >= max_in_flight:
+                    break
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        # Client went away or the stream was closed early
+        for task in pending:
+            task.cancel()
+
+
+async def process_document_bytes(image_bytes: bytes, document_type: str, wait: bool = False) -> dict:
+    """
+    Process an uploaded image in the OCR worker pool and return the document
+    type's result dict. With wait=True the call queues for a free worker
+    instead of raising OCRPoolBusyError (used by batch jobs). documentType
+    "auto" classifies the image first (UnrecognizedDocument if that fails).
+    """
+    requested = document_type.lower()
+    ocr_config = AUTO if requested == AUTO else get_document_type(requested).ocr_config
+    started = time.perf_counter()
+    timer = StageTimer()
+
+    # Identical uploads (retries, double-clicks) are answered from the cache
+    key = cache_key(image_bytes, requested, ocr_config)
+    key_scope = f"{requested} {ocr_config}"
+    cached = await result_cache.lookup(key)
+    if cached is not None:
+        logger.info("Result cache hit, skipping OCR")
+        count_document(requested, "cache_hit")
+        return cached
+
+    hashes = None
+    if near_duplicates_enabled():
+        try:
+            hashes, duplicate = await find_near_duplicate(image_bytes, key_scope, wait)
+        except OCRPoolBusyError:
+            count_document(requested, "busy")
+            raise
+        if duplicate is not None:
+            count_document(requested, "near_duplicate")
+            await result_cache.store(key, duplicate)
+            return duplicate
+
+    logger.debug("Starting OCR processing for type: %s", requested)
+    try:
+        name, result, text, stages = await ocr_pool.run(run_pipeline, image_bytes, requested, wait=wait)
+    except OCRPoolBusyError:
+        count_document(requested, "busy")
+        raise
+    except UnrecognizedDocument:
+        count_document(requested, "unrecognized")
+        raise
+    except Exception:
+        count_document(requested, "error")
+        raise
+    timer.merge(stages)
+    await result_cache.store(key, result)
+    # Only documents with a number can be verified when seen again
+    if hashes is not None and result.get('documentNumber'):
+        near_duplicates.add(hashes, key_scope, name, result['documentNumber'], result)
+
+    # Raw text and results contain personal data: only for flagged requests
+    if debug_request.get():
+        logger.info("Raw OCR text:\n%s", text)
+        logger.info("Extracted result: %s", result)
+
+    # Whatever is not accounted for by a stage was spent waiting for a worker
+    total = time.perf_counter() - started
+    timer.stages["queue"] = max(0.0, total - sum(timer.stages.values()))
+    record_stages(name, timer.stages)
+    count_document(name, "ok")
+    logger.info(
+        "Document processing completed in %.1fms, stages: %s", total * 1000, timer.as_ms(),
+        extra={"documentType": name, "durationMs": round(total * 1000, 2)}
+    )
+    return result
@@ -0,0 +1,171 @@
+# src/services/result_cache.py
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# In-memory tier: max number of results kept and their time-to-live in seconds
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", 1024))
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", 3600))
+# Optional on-disk tier (sqlite file) that survives restarts; disabled when unset
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH")
+RESULT_CACHE_DISK_SIZE = int(os.getenv("RESULT_CACHE_DISK_SIZE", 100000))
+
+
+def cache_key(contents: bytes, document_type: str, ocr_config: str) -> str:
+    """Content-addressed key: hash of the uploaded bytes plus what was asked of them."""
+    digest = hashlib.sha256(contents)
+    digest.update(b"\0" + document_type.lower().encode())
+    digest.update(b"\0" + ocr_config.encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier cache of extraction results (JSON-serialisable dicts).
+
+    Memory tier is an LRU bounded by entry count with per-entry TTL. The disk
+    tier is a sqlite table with the same TTL; disk hits are promoted to memory.
+    Async callers use lookup()/store(), which run the sqlite queries in a
+    thread.
+    """
+
+    def __init__(self, max_entries: int, ttl: int, path: Optional[str] = None, disk_max_entries: int = 100000):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_max_entries = disk_max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Serializes use of the sqlite connection
+        self._db_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._disk_writes = 0
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_created ON results (created)")
+
+    def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is None and self._db is not None:
+            value = self._get_disk(key, now)
+        if value is None:
+            self._count_miss()
+        return value
+
+    async def lookup(self, key: str) -> Optional[dict]:
+        """get() for the event loop: the memory tier inline, sqlite in a thread."""
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is None and self._db is not None:
+            value = await asyncio.to_thread(self._get_disk, key, now)
+        if value is None:
+            self._count_miss()
+        return value
+
+    def set(self, key: str, value: dict):
+        now = time.time()
+        self._set_memory(key, value, now)
+        if self._db is not None:
+            self._set_disk(key, value, now)
+
+    async def store(self, key: str, value: dict):
+        """set() for the event loop: the memory tier inline, sqlite in a thread."""
+        now = time.time()
+        self._set_memory(key, value, now)
+        if self._db is not None:
+            await asyncio.to_thread(self._set_disk, key, value, now)
+
+    def _get_memory(self, key: str, now: float) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created, value = entry
+            if now - created > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def _get_disk(self, key: str, now: float) -> Optional[dict]:
+        # The memory lock is not held across sqlite calls, so memory hits
+        # never wait on the database
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT value, created FROM results WHERE key = ? AND created >= ?",
+                (key, now - self.ttl)
+            ).fetchone()
+        if row is None:
+            return None
+        value = json.loads(row[0])
+        with self._lock:
+            self._remember(key, value, row[1])
+            self.hits += 1
+            self.disk_hits += 1
+        return value
+
+    def _count_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def _set_memory(self, key: str, value: dict, now: float):
+        with self._lock:
+            self._remember(key, value, now)
+
+    def _set_disk(self, key: str, value: dict, now: float):
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, value, created) VALUES (?, ?, ?)",
+                (key, json.dumps(value), now)
+            )
+            self._disk_writes += 1
+            if self._disk_writes % 256 == 0:
+                self._prune_disk(now)
+
+    def _remember(self, key: str, value: dict, created: float):
+        self._entries[key] = (created, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _prune_disk(self, now: float):
+        self._db.execute("DELETE FROM results WHERE created < ?", (now - self.ttl,))
+        self._db.execute(
+            "DELETE FROM results WHERE key IN "
+            "(SELECT key FROM results ORDER BY created DESC LIMIT -1 OFFSET ?)",
+            (self.disk_max_entries,)
+        )
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "diskHits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "diskEnabled": self._db is not None,
+        }
+
+
+result_cache = ResultCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL, RESULT_CACHE_PATH, RESULT_CACHE_DISK_SIZE)
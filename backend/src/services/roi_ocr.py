@@ -0,0 +1,189 @@
+# src/services/roi_ocr.py
+import logging
+import os
+import string
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.ocr_engine import OCRResult, OCRWords, get_engine
+from utils.text_regions import Box, crop_line, crop_placement, find_text_lines
+
+logger = logging.getLogger(__name__)
+
+# "1" always OCRs text-line crops first, "0" never does, "auto" only with the
+# in-process tesserocr backend (with pytesseract every crop costs a subprocess)
+OCR_ROI = os.getenv("OCR_ROI", "auto")
+ROI_OCR_THREADS = int(os.getenv("ROI_OCR_THREADS", 4))
+
+ALPHANUMERIC = string.ascii_uppercase + string.digits
+LATIN_TEXT = string.ascii_letters + string.digits + " /:.,'-"
+MRZ_CHARS = ALPHANUMERIC + "<"
+
+
+@dataclass(frozen=True)
+class FieldZone:
+    """Part of a document (relative x0, y0, x1, y1) and how to OCR lines in it"""
+    name: str
+    box: Tuple[float, float, float, float]
+    whitelist: Optional[str] = None
+
+
+# Zones are tried in order; a line belongs to the first zone containing its centre.
+# Lines outside every zone (headers, photo, signature) are not OCRed at all.
+FIELD_ZONES: Dict[str, List[FieldZone]] = {
+    'pan_card': [
+        FieldZone('number_band', (0.0, 0.25, 0.8, 0.55), ALPHANUMERIC),
+        FieldZone('name_lines', (0.0, 0.2, 0.8, 1.0), LATIN_TEXT),
+    ],
+    'passport': [
+        FieldZone('mrz', (0.0, 0.75, 1.0, 1.0), MRZ_CHARS),
+        FieldZone('details', (0.25, 0.1, 1.0, 0.75), LATIN_TEXT),
+    ],
+}
+FIELD_ZONES['pan'] = FIELD_ZONES['pan_card']
+
+_executor: Optional[ThreadPoolExecutor] = None
+# Callers in several threads may ask for it at once
+_executor_lock = threading.Lock()
+
+
+def roi_enabled() -> bool:
+    if OCR_ROI == "auto":
+        return get_engine().name == "tesserocr"
+    return OCR_ROI == "1"
+
+
+def roi_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=ROI_OCR_THREADS, thread_name_prefix="roi-ocr")
+    return _executor
+
+
+def warm_up_threads(image, langs, timeout: float = 30.0):
+    """
+    Load the models of `langs` in every ROI thread (services/warmup.py):
+    tesserocr handles are per thread. A barrier hands each thread one job.
+    """
+    engine = get_engine()
+    barrier = threading.Barrier(ROI_OCR_THREADS)
+
+    def warm(_):
+        barrier.wait(timeout)
+        for lang in langs:
+            engine.recognize(image, lang=lang, psm=7)
+
+    list(roi_executor().map(warm, range(ROI_OCR_THREADS)))
+
+
+def assign_zones(boxes: List[Box], zones: List[FieldZone], width: int, height: int) -> List[Tuple[Box, FieldZone]]:
+    assigned = []
+    for box in boxes:
+        x, y, w, h = box
+        cx, cy = (x + w / 2) / width, (y + h / 2) / height
+        for zone in zones:
+            x0, y0, x1, y1 = zone.box
+            if x0 <= cx <= x1 and y0 <= cy <= y1:
+                assigned.append((box, zone))
+                break
+    return assigned
+
+
+def ocr_text_regions(image, document_type: str, lang: str = "eng") -> OCRResult:
+    """
+    OCR only the text lines that fall inside the document type's field zones,
+    one line per crop (--psm 7) with the zone's character whitelist, crops in
+    parallel. Returns the recognised lines joined top-to-bottom, the mean
+    confidence of the non-empty crops and the crops' words in image
+    coordinates.
+    """
+    zones = FIELD_ZONES.get(document_type.lower())
+    if not zones:
+        return OCRResult("", 0.0)
+
+    gray = np.asarray(image)
+    if gray.ndim == 3:
+        gray = gray.mean(axis=2).astype(np.uint8)
+    height, width = gray.shape[:2]
+
+    lines = assign_zones(find_text_lines(gray), zones, width, height)
+    if not lines:
+        return OCRResult("", 0.0)
+    logger.debug("ROI OCR on %d line crops", len(lines))
+
+    engine = get_engine()
+
+    def recognize(item):
+        box, zone = item
+        return engine.recognize(crop_line(gray, box), lang=lang, psm=7, whitelist=zone.whitelist)
+
+    results = list(roi_executor().map(recognize, lines))
+    texts = [result.text.strip() for result in results]
+    confidences = [result.confidence for result, text in zip(results, texts) if text]
+
+    # Boxes on the same row (e.g. "Name :" label and its value) become one line
+    rows: List[List[Tuple[int, int]]] = []
+    row_bottom = -1
+    for index, (box, _) in enumerate(lines):
+        x, y, w, h = box
+        if not rows or y + h / 2 > row_bottom:
+            rows.append([])
+            row_bottom = y + h
+        rows[-1].append((x, index))
+
+    # Join the crops' text, noting where each crop's text starts
+    row_texts = []
+    placed: List[Tuple[int, int]] = []
+    length = 0
+    for row in rows:
+        row_text = ""
+        for _, index in sorted(row):
+            if texts[index]:
+                row_text += " " if row_text else ""
+                placed.append((index, length + len(row_text)))
+                row_text += texts[index]
+        row_texts.append(row_text)
+        length += len(row_text) + 1
+    joined = "\n".join(row_texts)
+    text = joined.strip()
+    leading = len(joined) - len(joined.lstrip())
+
+    words = []
+    for index, offset in placed:
+        left, top, _, scale = crop_placement(lines[index][0])
+        raw = results[index].text
+        offset -= leading + len(raw) - len(raw.lstrip())
+        words.append(results[index].words.shifted(offset, (left, top), scale))
+    return OCRResult(text, sum(confidences) / len(confidences) if confidences else 0.0, OCRWords.concat(words))
+
+
+def find_in_text_regions(image, document_type: str, needle: str, lang: str = "eng") -> Optional[bool]:
+    """
+    Whether `needle` (spaces ignored) is printed in the document type's field
+    zones, OCRing line crops one at a time in zone order and stopping at the
+    first match. None when the type has no zones.
+    """
+    zones = FIELD_ZONES.get(document_type.lower())
+    if not zones:
+        return None
+
+    gray = np.asarray(image)
+    if gray.ndim == 3:
+        gray = gray.mean(axis=2).astype(np.uint8)
+    height, width = gray.shape[:2]
+
+    needle = "".join(needle.split()).upper()
+    engine = get_engine()
+    lines = assign_zones(find_text_lines(gray), zones, width, height)
+    lines.sort(key=lambda item: zones.index(item[1]))
+    for box, zone in lines:
+        text = engine.image_to_string(crop_line(gray, box), lang=lang, psm=7, whitelist=zone.whitelist)
+        if needle in "".join(text.split()).upper():
+            return True
+    return False
@@ -0,0 +1,150 @@
+# src/services/upload.py
+import contextlib
+import os
+from typing import BinaryIO, Collection, Optional
+
+from fastapi import Request, UploadFile
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from utils.image_processing import OCR_MAX_DIMENSION
+
+# Largest single image accepted (bytes)
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", 10 * 1024 * 1024))
+# Largest multi-page PDF/TIFF accepted (bytes)
+UPLOAD_MAX_DOCUMENT_BYTES = int(os.getenv("UPLOAD_MAX_DOCUMENT_BYTES", 50 * 1024 * 1024))
+# Largest request body accepted, checked from Content-Length before the body
+# is read (batch uploads carry many images)
+UPLOAD_MAX_REQUEST_BYTES = int(os.getenv("UPLOAD_MAX_REQUEST_BYTES", 200 * 1024 * 1024))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024))
+
+# What GET /api/capabilities asks clients to upload: images shrunk to
+# UPLOAD_MAX_DIMENSION pixels on the longer side (by default the largest size
+# the downscale and OpenCV preprocessors decode at), converted to grayscale,
+# in the first of UPLOAD_FORMATS the client can encode
+UPLOAD_MAX_DIMENSION = int(os.getenv("UPLOAD_MAX_DIMENSION", OCR_MAX_DIMENSION))
+UPLOAD_FORMATS = tuple(os.getenv("UPLOAD_FORMATS", "webp,png,jpeg").split(","))
+UPLOAD_GRAYSCALE = os.getenv("UPLOAD_GRAYSCALE", "1") == "1"
+# Quality of lossy encodings, as canvas.toBlob() takes it (0-1)
+UPLOAD_QUALITY = float(os.getenv("UPLOAD_QUALITY", 0.9))
+
+# Leading bytes of the formats the OCR pipeline can read
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"II*\x00", "tiff"),
+    (b"MM\x00*", "tiff"),
+    (b"BM", "bmp"),
+    (b"%PDF-", "pdf"),
+)
+# What single-image endpoints accept; multi-page ones add PDF
+IMAGE_FORMATS = frozenset(("jpeg", "png", "tiff", "bmp", "webp"))
+DOCUMENT_FORMATS = IMAGE_FORMATS | {"pdf"}
+
+
+class UploadError(Exception):
+    """Upload rejected before decoding; status_code is the HTTP status to return"""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def client_capabilities() -> dict:
+    """Preferred upload size and encoding, for clients that can shrink images before sending them."""
+    return {
+        "maxDimension": UPLOAD_MAX_DIMENSION,
+        "formats": [f"image/{name}" for name in UPLOAD_FORMATS],
+        "grayscale": UPLOAD_GRAYSCALE,
+        "quality": UPLOAD_QUALITY,
+        "maxBytes": UPLOAD_MAX_BYTES,
+    }
+
+
+def sniff_image_format(header: bytes) -> Optional[str]:
+    for signature, name in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return name
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def check_image_bytes(
+    contents: bytes, max_bytes: int = UPLOAD_MAX_BYTES, formats: Collection[str] = IMAGE_FORMATS
+) -> bytes:
+    """Raise UploadError unless `contents` is in one of `formats` and within the size cap."""
+    if not contents:
+        raise UploadError("Empty upload", 400)
+    if len(contents) > max_bytes:
+        raise UploadError(f"Upload exceeds {max_bytes} bytes", 413)
+    if sniff_image_format(contents[:16]) not in formats:
+        raise UploadError("Unsupported file type, expected an image", 415)
+    return contents
+
+
+def read_capped(stream: BinaryIO, max_bytes: int = UPLOAD_MAX_BYTES) -> bytes:
+    """Read at most max_bytes + 1 bytes: enough for check_image_bytes to reject it."""
+    return stream.read(max_bytes + 1)
+
+
+async def read_upload(
+    file: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES, formats: Collection[str] = IMAGE_FORMATS
+) -> bytes:
+    """
+    Read an uploaded image, rejecting oversized and non-image payloads as
+    early as possible: from the part size, then from the first bytes.
+    """
+    if file.size is not None:
+        if file.size > max_bytes:
+            raise UploadError(f"Upload exceeds {max_bytes} bytes", 413)
+        header = await file.read(16)
+        if header and sniff_image_format(header) not in formats:
+            raise UploadError("Unsupported file type, expected an image", 415)
+        await file.seek(0)
+        # One allocation of the final size
+        return check_image_bytes(await file.read(max_bytes + 1), max_bytes, formats)
+
+    # Unknown size: read in chunks and stop as soon as the cap is crossed
+    chunks = []
+    total = 0
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        if not chunks and sniff_image_format(chunk[:16]) not in formats:
+            raise UploadError("Unsupported file type, expected an image", 415)
+        total += len(chunk)
+        if total > max_bytes:
+            raise UploadError(f"Upload exceeds {max_bytes} bytes", 413)
+        chunks.append(chunk)
+    return check_image_bytes(b"".join(chunks), max_bytes, formats)
+
+
+async def upload_limit_middleware(request: Request, call_next):
+    """Reject request bodies larger than UPLOAD_MAX_REQUEST_BYTES before reading them."""
+    length = request.headers.get("content-length")
+    if length is not None and length.isdigit() and int(length) > UPLOAD_MAX_REQUEST_BYTES:
+        return JSONResponse(
+            status_code=413,
+            content={"detail": f"Request body exceeds {UPLOAD_MAX_REQUEST_BYTES} bytes"}
+        )
+    return await call_next(request)
+
+
+class TempFileStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that deletes the temporary file `path` once the response
+    is over, however it ended: a client that disconnects before the first
+    byte skips both the body iterator and background tasks.
+    """
+
+    def __init__(self, content, path: str, **kwargs):
+        super().__init__(content, **kwargs)
+        self.path = path
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.path)
@@ -0,0 +1,148 @@
+# src/services/warmup.py
+"""
+Startup warm-up of the OCR workers and the readiness state behind GET /api/ready.
+
+Every OCR pool worker runs warm_up_worker as its initializer, before it takes
+its first job: it creates the OCR engine, loads the language models of every
+registered document type (one OCR call each on the bundled tiny image
+assets/warmup.png; with ROI OCR also in every ROI thread, tesserocr handles
+being per thread), runs the classifier, each preprocessor and the field
+extractors. Since a worker only reads jobs once its initializer has
+returned, no request ever lands on a cold worker. At API startup warm_up()
+starts the pool, waits until every worker has answered a status job and
+only then flips the readiness probe.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import List, Optional
+
+from services.ocr_pool import OCRWorkerPool, ocr_pool
+from utils.timing import StageTimer
+
+logger = logging.getLogger(__name__)
+
+# "0" skips the warm-up: the API is ready immediately, workers start on demand
+WARMUP = os.getenv("WARMUP", "1") == "1"
+# Seconds between rounds of status jobs while some workers are still warming up
+WARMUP_POLL_INTERVAL = 0.05
+WARMUP_IMAGE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "warmup.png")
+
+# Set in each worker by warm_up_worker
+_worker_stages: dict = {}
+_worker_error: Optional[str] = None
+
+
+def warm_up_worker():
+    """OCR pool initializer. Never raises: a failed warm-up only leaves the worker cold."""
+    global _worker_stages, _worker_error
+    timer = StageTimer()
+    try:
+        with timer.stage("imports"):
+            from services.classifier import classify_image, load_thumbnail
+            from services.field_extraction import extract_fields
+            from services.ocr_engine import get_engine
+            from services.pipeline import DOCUMENT_TYPES, PREPROCESSORS
+            from services.roi_ocr import FIELD_ZONES, roi_enabled, warm_up_threads
+            from utils.image_processing import decode_image
+
+        with open(WARMUP_IMAGE, "rb") as f:
+            image_bytes = f.read()
+        with timer.stage("engine"):
+            engine = get_engine()
+        with timer.stage("preprocess"):
+            classify_image(load_thumbnail(image_bytes), DOCUMENT_TYPES.values())
+            image = decode_image(image_bytes)
+            for _, preprocess in PREPROCESSORS.values():
+                preprocess(image)
+        # One OCR call per language combination loads its traineddata
+        # (tesserocr) or pulls it into the page cache (pytesseract)
+        with timer.stage("models"):
+            models = {(document_type.lang, document_type.oem) for document_type in DOCUMENT_TYPES.values()}
+            models |= {
+                (document_type.fallback_lang, document_type.oem)
+                for document_type in DOCUMENT_TYPES.values() if document_type.fallback_lang
+            }
+            text = ""
+            for lang, oem in sorted(models):
+                text = engine.recognize(image, lang=lang, psm=7, oem=oem).text
+            # pytesseract keeps nothing loaded between calls
+            if roi_enabled() and engine.name == "tesserocr":
+                warm_up_threads(image, sorted({
+                    document_type.lang for document_type in DOCUMENT_TYPES.values()
+                    if document_type.name in FIELD_ZONES
+                }))
+        with timer.stage("extract"):
+            for document_type in DOCUMENT_TYPES.values():
+                extract_fields(text, document_type.fields)
+    except Exception as e:
+        _worker_error = str(e)
+        logger.warning("OCR worker warm-up failed: %s", e, exc_info=True)
+    _worker_stages = timer.as_ms()
+    logger.debug("OCR worker %d warm: %s", os.getpid(), _worker_stages)
+
+
+def worker_status() -> dict:
+    """Pool job: this worker's warm-up timings (it only runs once the worker is warm)."""
+    return {"pid": os.getpid(), "warmupMs": _worker_stages, "error": _worker_error}
+
+
+class StartupState:
+    """Import/warm-up timings and readiness of the API process"""
+
+    def __init__(self):
+        self.ready = False
+        # perf_counter() when the process started importing the app
+        self.started: Optional[float] = None
+        self.import_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+        self.startup_seconds: Optional[float] = None
+        self.workers: List[dict] = []
+
+    def as_response(self) -> dict:
+        return {
+            "ready": self.ready,
+            "importSeconds": self.import_seconds,
+            "warmupSeconds": self.warmup_seconds,
+            "startupSeconds": self.startup_seconds,
+            "workers": self.workers,
+        }
+
+
+startup = StartupState()
+
+
+async def warm_up(pool: OCRWorkerPool = ocr_pool):
+    """Start `pool` with warm workers and wait until each has reported; then mark the process ready."""
+    started = time.perf_counter()
+    if WARMUP:
+        pool.initializer = warm_up_worker
+        # The API process hashes uploads itself (near-duplicate lookup)
+        from services.near_duplicates import image_hashes
+        with open(WARMUP_IMAGE, "rb") as f:
+            image_hashes(f.read())
+
+        # A worker that is warm first may answer several status jobs: ask
+        # again until every worker has answered
+        workers = {}
+        while len(workers) < pool.workers:
+            if workers:
+                await asyncio.sleep(WARMUP_POLL_INTERVAL)
+            statuses = await asyncio.gather(
+                *(pool.run(worker_status, wait=True) for _ in range(pool.workers - len(workers)))
+            )
+            workers.update((status["pid"], status) for status in statuses)
+        startup.workers = list(workers.values())
+        failed = [worker for worker in startup.workers if worker["error"]]
+        if failed:
+            logger.warning("%d OCR workers failed to warm up", len(failed))
+    finished = time.perf_counter()
+    startup.warmup_seconds = round(finished - started, 3)
+    if startup.started is not None:
+        startup.startup_seconds = round(finished - startup.started, 3)
+    startup.ready = True
+    logger.info(
+        "Ready after %ss (imports %ss, warm-up %ss, %d warm workers)",
+        startup.startup_seconds, startup.import_seconds, startup.warmup_seconds, len(startup.workers)
+    )
@@ -1,72 +1,530 @@
 # src/utils/image_processing.py
 import cv2
 import numpy as np
-from PIL import Image
+from PIL import Image, ImageEnhance
 import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
 
-def preprocess_image(image_bytes: bytes) -> np.ndarray:
-    # Convert bytes to numpy array
-    nparr = np.frombuffer(image_bytes, np.uint8)
-    img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-    
-    # Get original dimensions
+
+@dataclass(frozen=True)
+class PreprocessProfile:
+    """Knobs for one preprocessing speed/accuracy trade-off"""
+    name: str
+    max_dimension: int = 1800
+    # 'nlmeans' (slow, best), 'bilateral', 'median' or None to skip
+    denoise: Optional[str] = None
+    clahe: bool = True
+    # Scale the output so the median glyph height lands near this many pixels.
+    # None keeps the old fixed upscale factor.
+    target_text_height: Optional[int] = 32
+    fixed_scale: float = 2.0
+    max_upscale: float = 2.0
+
+
+PREPROCESS_PROFILES = {
+    # Cheapest: no denoising, no CLAHE, never upscale more than 1.5x
+    'fast': PreprocessProfile('fast', denoise=None, clahe=False, max_upscale=1.5),
+    # Median filter instead of NL-means, text-height driven scaling
+    'balanced': PreprocessProfile('balanced', denoise='median'),
+    # Original pipeline: NL-means denoising and a fixed 2x LANCZOS upscale
+    'quality': PreprocessProfile('quality', denoise='nlmeans', target_text_height=None),
+}
+
+DEFAULT_PROFILE = os.getenv("PREPROCESS_PROFILE", "balanced")
+
+# Images of at least PREPROCESS_TILE_MIN_PIXELS are split into horizontal
+# strips processed on PREPROCESS_THREADS threads per worker. Strips overlap by
+# PREPROCESS_TILE_OVERLAP rows, which has to cover the filter radius of the
+# stages run per strip (blur + threshold: 7, NL-means: 13).
+PREPROCESS_THREADS = int(os.getenv("PREPROCESS_THREADS", min(4, os.cpu_count() or 1)))
+PREPROCESS_TILE_MIN_PIXELS = int(os.getenv("PREPROCESS_TILE_MIN_PIXELS", 1_000_000))
+PREPROCESS_TILE_OVERLAP = 16
+
+# Resize policy of the 'downscale' preprocessor (never upscales)
+OCR_MAX_DIMENSION = int(os.getenv("OCR_MAX_DIMENSION", 2000))
+OCR_TARGET_DPI = int(os.getenv("OCR_TARGET_DPI", 300))
+OCR_TARGET_TEXT_HEIGHT = int(os.getenv("OCR_TARGET_TEXT_HEIGHT", 32))
+
+# Deskew: search range and resolution of the angle estimate. Angles below
+# DESKEW_MIN_ANGLE are not worth the cost (and blur) of a warp.
+DESKEW_MAX_ANGLE = 15.0
+DESKEW_MIN_ANGLE = 0.3
+DESKEW_THUMBNAIL_SIZE = 600
+DESKEW_MAX_POINTS = 20000
+
+# JPEG can be decoded at 1/2, 1/4 or 1/8 size directly (DCT scaling)
+REDUCED_GRAYSCALE_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_GRAYSCALE_8),
+    (4, cv2.IMREAD_REDUCED_GRAYSCALE_4),
+    (2, cv2.IMREAD_REDUCED_GRAYSCALE_2),
+)
+
+
+def get_profile(profile=None) -> PreprocessProfile:
+    if isinstance(profile, PreprocessProfile):
+        return profile
+    name = profile or DEFAULT_PROFILE
+    if name not in PREPROCESS_PROFILES:
+        raise ValueError(f"Unknown preprocessing profile: {name}")
+    return PREPROCESS_PROFILES[name]
+
+
+def denoise_image(img: np.ndarray, method: Optional[str], dst: Optional[np.ndarray] = None) -> np.ndarray:
+    """Denoise `img`, into `dst` when given (it must not be `img`)."""
+    if method is None:
+        return img
+    if method == 'nlmeans':
+        return cv2.fastNlMeansDenoising(img, dst)
+    if method == 'bilateral':
+        return cv2.bilateralFilter(img, 5, 50, 50, dst)
+    if method == 'median':
+        return cv2.medianBlur(img, 3, dst)
+    raise ValueError(f"Unknown denoise method: {method}")
+
+
+def _blur_threshold(img: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """5x5 Gaussian blur, then Gaussian adaptive threshold in place."""
+    cv2.GaussianBlur(img, (5, 5), 0, dst)
+    return cv2.adaptiveThreshold(dst, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2, dst)
+
+
+class ScratchBuffers:
+    """
+    Growable uint8 work arrays, one set per thread (scratch_buffers()).
+
+    get() hands out a view of the named buffer with the requested shape and
+    only allocates when the buffer is too small, so a worker processing
+    images of similar size allocates its intermediates once.
+    """
+
+    def __init__(self):
+        self._buffers: Dict[str, np.ndarray] = {}
+        self.allocated_bytes = 0
+        self.clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+
+    def get(self, name: str, shape: Tuple[int, ...]) -> np.ndarray:
+        size = int(np.prod(shape))
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.size < size:
+            buffer = self._buffers[name] = np.empty(size, np.uint8)
+            self.allocated_bytes += size
+        return buffer[:size].reshape(shape)
+
+
+_local = threading.local()
+
+
+def scratch_buffers() -> ScratchBuffers:
+    """This thread's scratch buffers"""
+    scratch = getattr(_local, "scratch", None)
+    if scratch is None:
+        scratch = _local.scratch = ScratchBuffers()
+    return scratch
+
+
+@dataclass
+class PreprocessStats:
+    """Wall time (seconds) and newly allocated bytes of each preprocessing stage"""
+    seconds: Dict[str, float] = field(default_factory=dict)
+    allocated: Dict[str, int] = field(default_factory=dict)
+    # Strips the image was split into
+    strips: int = 1
+
+
+@contextmanager
+def _stage(stats: Optional[PreprocessStats], name: str, scratch: ScratchBuffers):
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    allocated = scratch.allocated_bytes
+    try:
+        yield
+    finally:
+        stats.seconds[name] = stats.seconds.get(name, 0.0) + time.perf_counter() - start
+        stats.allocated[name] = stats.allocated.get(name, 0) + scratch.allocated_bytes - allocated
+
+
+_tile_executor: Optional[ThreadPoolExecutor] = None
+# ROI threads preprocess concurrently: only one of them may create the executor
+_tile_executor_lock = threading.Lock()
+
+
+def tile_executor() -> ThreadPoolExecutor:
+    global _tile_executor
+    if _tile_executor is None:
+        with _tile_executor_lock:
+            if _tile_executor is None:
+                _tile_executor = ThreadPoolExecutor(max_workers=PREPROCESS_THREADS, thread_name_prefix="preprocess")
+    return _tile_executor
+
+
+def strip_bounds(shape: Tuple[int, ...]) -> List[Tuple[int, int]]:
+    """
+    Row ranges an image of this shape is split into: one per thread for
+    images of at least PREPROCESS_TILE_MIN_PIXELS, never thinner than four
+    times the overlap.
+    """
+    height, width = shape[:2]
+    count = 1
+    if PREPROCESS_THREADS > 1 and height * width >= PREPROCESS_TILE_MIN_PIXELS:
+        count = max(1, min(PREPROCESS_THREADS, height // (PREPROCESS_TILE_OVERLAP * 4)))
+    step = -(-height // count)
+    return [(top, min(height, top + step)) for top in range(0, height, step)]
+
+
+def run_in_strips(
+    src: np.ndarray,
+    dst: np.ndarray,
+    fn: Callable[[np.ndarray, np.ndarray], np.ndarray],
+    scratch: ScratchBuffers
+) -> np.ndarray:
+    """
+    dst = fn(src, dst), computed on horizontal strips in parallel (OpenCV
+    releases the GIL). Each strip is processed with PREPROCESS_TILE_OVERLAP
+    extra rows above and below, more than the radius of any filter run this
+    way, and only its own rows are copied to dst: the result is identical to
+    a single fn call on the whole image.
+    """
+    strips = strip_bounds(src.shape)
+    if len(strips) == 1:
+        fn(src, dst)
+        return dst
+
+    height = src.shape[0]
+    # Strip outputs come from the caller's buffers, allocated once per shape
+    outputs = []
+    for index, (top, bottom) in enumerate(strips):
+        low, high = max(0, top - PREPROCESS_TILE_OVERLAP), min(height, bottom + PREPROCESS_TILE_OVERLAP)
+        outputs.append(scratch.get(f"strip{index}", (high - low,) + src.shape[1:]))
+
+    def process(index: int):
+        top, bottom = strips[index]
+        low, high = max(0, top - PREPROCESS_TILE_OVERLAP), min(height, bottom + PREPROCESS_TILE_OVERLAP)
+        out = fn(src[low:high], outputs[index])
+        dst[top:bottom] = out[top - low:bottom - low]
+
+    list(tile_executor().map(process, range(len(strips))))
+    return dst
+
+
+def estimate_text_height(binary: np.ndarray) -> Optional[float]:
+    """
+    Estimate the median glyph height (in pixels) of dark text on a light
+    background from connected components. Returns None if nothing text-like
+    is found.
+    """
+    foreground = (binary < 128).astype(np.uint8)
+    count, _, stats, _ = cv2.connectedComponentsWithStats(foreground, connectivity=8)
+    if count <= 1:
+        return None
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    widths = stats[1:, cv2.CC_STAT_WIDTH]
+    # Keep blobs shaped like characters: not specks, not lines or photo regions
+    glyphs = (heights >= 6) & (heights <= binary.shape[0] // 4) & (widths <= heights * 3)
+    if not np.any(glyphs):
+        return None
+    return float(np.median(heights[glyphs]))
+
+
+def estimate_skew_angle(
+    binary: np.ndarray,
+    max_angle: float = DESKEW_MAX_ANGLE,
+    thumbnail_size: int = DESKEW_THUMBNAIL_SIZE
+) -> float:
+    """
+    Estimate the rotation (degrees, cv2.getRotationMatrix2D convention) that
+    levels dark text on a light background, using a projection profile on a
+    downsampled copy. Text lines give the sharpest
+    row histogram when they are horizontal, so the angle maximising the sum
+    of squared row counts wins. All candidate angles are scored in one
+    vectorised pass over a bounded number of foreground points.
+    """
+    height, width = binary.shape[:2]
+    scale = min(1.0, thumbnail_size / max(height, width))
+    thumb = binary
+    if scale < 1.0:
+        thumb = cv2.resize(binary, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    ys, xs = np.nonzero(thumb < 128)
+    if len(ys) < 50:
+        return 0.0
+    if len(ys) > DESKEW_MAX_POINTS:
+        step = len(ys) // DESKEW_MAX_POINTS + 1
+        ys, xs = ys[::step], xs[::step]
+    ys = ys.astype(np.float32) - thumb.shape[0] / 2
+    xs = xs.astype(np.float32) - thumb.shape[1] / 2
+
+    def best_angle(candidates: np.ndarray) -> float:
+        radians = np.deg2rad(candidates).astype(np.float32)[:, None]
+        # Row of each point after rotating the image by each candidate angle
+        rows = ys * np.cos(radians) - xs * np.sin(radians)
+        rows = np.rint(rows - rows.min()).astype(np.int64)
+        bins = int(rows.max()) + 1
+        offsets = np.arange(len(candidates), dtype=np.int64)[:, None] * bins
+        histograms = np.bincount((rows + offsets).ravel(), minlength=len(candidates) * bins)
+        histograms = histograms.reshape(len(candidates), bins).astype(np.float64)
+        return round(float(candidates[np.argmax((histograms ** 2).sum(axis=1))]), 2)
+
+    # Coarse search, then refine around the best coarse angle
+    coarse = best_angle(np.arange(-max_angle, max_angle + 0.5, 1.0))
+    return best_angle(np.arange(coarse - 1.0, coarse + 1.0 + 0.1, 0.1))
+
+
+def deskew(img: np.ndarray, angle: float, dst: Optional[np.ndarray] = None) -> np.ndarray:
+    """Rotate by `angle` degrees around the centre (into `dst`); no-op for tiny angles."""
+    if abs(angle) < DESKEW_MIN_ANGLE:
+        return img
     height, width = img.shape[:2]
-    
-    # Resize if image is too large (keeping aspect ratio)
-    max_dimension = 1800
-    if max(height, width) > max_dimension:
-        scale = max_dimension / max(height, width)
-        img = cv2.resize(img, None, fx=scale, fy=scale)
-    
-    # Convert to grayscale
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    
-    # Apply adaptive thresholding
-    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-    thresh = cv2.adaptiveThreshold(
-        blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-        cv2.THRESH_BINARY, 11, 2
-    )
-    
-    # Noise removal
-    kernel = np.ones((1, 1), np.uint8)
-    opening = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel)
-    
-    # Deskew image
-    coords = np.column_stack(np.where(opening > 0))
-    angle = cv2.minAreaRect(coords)[-1]
-    if angle < -45:
-        angle = 90 + angle
-    center = (width // 2, height // 2)
-    M = cv2.getRotationMatrix2D(center, angle, 1.0)
-    rotated = cv2.warpAffine(
-        opening, M, (width, height),
+    M = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    return cv2.warpAffine(
+        img, M, (width, height), dst,
         flags=cv2.INTER_CUBIC,
         borderMode=cv2.BORDER_REPLICATE
     )
-    
+
+
+def ocr_scale_factor(processed: np.ndarray, profile: PreprocessProfile) -> float:
+    if profile.target_text_height is None:
+        return profile.fixed_scale
+    text_height = estimate_text_height(processed)
+    if not text_height:
+        return 1.0
+    return float(np.clip(profile.target_text_height / text_height, 1.0, profile.max_upscale))
+
+
+def decode_flags(image_bytes: bytes, max_dimension: int) -> int:
+    """
+    imdecode flags for a grayscale decode. Large JPEGs are decoded at the
+    biggest power-of-two reduction that still leaves max_dimension pixels.
+    """
+    if not image_bytes.startswith(b"\xff\xd8"):
+        return cv2.IMREAD_GRAYSCALE
+    size = encoded_size(image_bytes)
+    if size is None:
+        return cv2.IMREAD_GRAYSCALE
+    for factor, flag in REDUCED_GRAYSCALE_FLAGS:
+        if max(size) // factor >= max_dimension:
+            return flag
+    return cv2.IMREAD_GRAYSCALE
+
+
+def encoded_size(image_bytes: bytes) -> Optional[Tuple[int, int]]:
+    """(width, height) of an encoded image, None if unreadable. Reads the header only."""
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as header:
+            return header.size
+    except Exception:
+        return None
+
+
+def decode_dimension(image_bytes: bytes, max_dimension: Optional[int]) -> Optional[int]:
+    """
+    max_dimension as decode_image applies it to these bytes: None when the
+    decode is full size anyway. Only JPEGs larger than max_dimension are
+    reduced while decoding.
+    """
+    if not max_dimension or not image_bytes.startswith(b"\xff\xd8"):
+        return None
+    size = encoded_size(image_bytes)
+    if size is None or max(size) <= max_dimension:
+        return None
+    return max_dimension
+
+
+def decode_webp_gray(image_bytes: bytes) -> Optional[Image.Image]:
+    """
+    8-bit grayscale decode of a WebP upload, None for other formats. WebP has
+    no grayscale mode, so even gray uploads are RGB; OpenCV decodes and
+    converts them about twice as fast as PIL.
+    """
+    if image_bytes[:4] != b"RIFF" or image_bytes[8:12] != b"WEBP":
+        return None
+    gray = cv2.imdecode(
+        np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE | cv2.IMREAD_IGNORE_ORIENTATION
+    )
+    return Image.fromarray(gray) if gray is not None else None
+
+
+def decode_image(image_bytes: bytes, max_dimension: Optional[int] = None) -> Image.Image:
+    """
+    Decode an upload to 8-bit grayscale. JPEGs are decoded straight to
+    grayscale and, when larger than max_dimension, at the biggest
+    power-of-two reduction that still covers it (PIL draft()). Other formats
+    are decoded at full size; grayscale PNGs need no conversion.
+    """
+    webp = decode_webp_gray(image_bytes)
+    if webp is not None:
+        return webp
+
+    image = Image.open(io.BytesIO(image_bytes))
+    width, height = image.size
+    target = image.size
+    if max_dimension and max(width, height) > max_dimension:
+        scale = max_dimension / max(width, height)
+        target = (max(1, int(width * scale)), max(1, int(height * scale)))
+    image.draft('L', target)
+
+    if image.mode != 'L':
+        image = image.convert('L')
+    else:
+        image.load()
+
+    # Keep the recorded DPI true to the pixels we actually decoded
+    dpi = image.info.get('dpi')
+    if dpi and image.width != width:
+        ratio = image.width / float(width)
+        image.info['dpi'] = (dpi[0] * ratio, dpi[1] * ratio)
+    return image
+
+
+def ocr_target_size(image: Image.Image) -> Tuple[int, int]:
+    """
+    Size to run OCR at: never larger than the source, capped at
+    OCR_MAX_DIMENSION and, when the file records its DPI, at OCR_TARGET_DPI.
+    """
+    width, height = image.size
+    scale = min(1.0, OCR_MAX_DIMENSION / width, OCR_MAX_DIMENSION / height)
+    dpi = image.info.get('dpi')
+    if dpi and dpi[0] and dpi[0] > OCR_TARGET_DPI:
+        scale = min(scale, OCR_TARGET_DPI / float(dpi[0]))
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def text_height_scale(image: Image.Image) -> float:
+    """
+    Downscale factor (<= 1.0) that brings oversized text down to about
+    OCR_TARGET_TEXT_HEIGHT pixels. Measured on a half-size copy to stay cheap.
+    """
+    thumb = np.asarray(image.reduce(2))
+    _, binary = cv2.threshold(thumb, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    text_height = estimate_text_height(binary)
+    if not text_height:
+        return 1.0
+    text_height *= 2
+    if text_height <= OCR_TARGET_TEXT_HEIGHT * 1.5:
+        return 1.0
+    return OCR_TARGET_TEXT_HEIGHT / text_height
+
+
+def downscale_for_ocr(image: Image.Image) -> Image.Image:
+    """Grayscale image -> OCR input. Only ever downscales."""
+    target_size = ocr_target_size(image)
+    if image.size != target_size:
+        image = image.resize(target_size, Image.LANCZOS, reducing_gap=2.0)
+
+    scale = text_height_scale(image)
+    if scale < 1.0:
+        image = image.resize(
+            (max(1, int(image.width * scale)), max(1, int(image.height * scale))),
+            Image.LANCZOS
+        )
+    return image
+
+
+def enhance_contrast(image: Image.Image, factor: float = 1.5) -> Image.Image:
+    return ImageEnhance.Contrast(image).enhance(factor)
+
+
+def preprocess_image(image_bytes: bytes, profile=None, stats: Optional[PreprocessStats] = None) -> np.ndarray:
+    profile = get_profile(profile)
+
+    # Decode straight to 8-bit grayscale from a view of the upload (no copy,
+    # no full-size colour image)
+    gray = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), decode_flags(image_bytes, profile.max_dimension))
+    if gray is None:
+        raise ValueError("Could not decode image")
+    return preprocess_array(gray, profile, stats)
+
+
+def preprocess_array(gray: np.ndarray, profile=None, stats: Optional[PreprocessStats] = None) -> np.ndarray:
+    """
+    OpenCV preprocessing of an already decoded grayscale image.
+
+    Intermediates live in this thread's ScratchBuffers, so a worker reuses the
+    same few full-size arrays for every image; only the returned array is new.
+    Blur + threshold (fused, one pass per strip) and denoising run on
+    overlapping strips in parallel for large images. Pass `stats` to collect
+    time and newly allocated bytes per stage.
+    """
+    profile = get_profile(profile)
+    scratch = scratch_buffers()
+    max_dimension = profile.max_dimension
+
+    # Resize if image is too large (keeping aspect ratio)
+    height, width = gray.shape[:2]
+    if max(height, width) > max_dimension:
+        scale = max_dimension / max(height, width)
+        # Same output size as cv2.resize with fx/fy (rounded)
+        shape = (int(round(height * scale)), int(round(width * scale)))
+        with _stage(stats, "resize", scratch):
+            gray = cv2.resize(gray, None, scratch.get("resized", shape), fx=scale, fy=scale)
+
+    # Adaptive thresholding. The old 1x1 MORPH_OPEN that followed was a no-op
+    # and is gone.
+    with _stage(stats, "threshold", scratch):
+        current = run_in_strips(gray, scratch.get("binary", gray.shape), _blur_threshold, scratch)
+
+    # Deskew image (angle estimated on a thumbnail, warp only when needed)
+    with _stage(stats, "deskew", scratch):
+        angle = estimate_skew_angle(current)
+        current = deskew(current, angle, dst=scratch.get("rotated", current.shape))
+
     # Increase contrast
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-    enhanced = clahe.apply(rotated)
-    
-    # Additional denoising
-    denoised = cv2.fastNlMeansDenoising(enhanced)
-    
-    return denoised
-
-def process_document_image(image_bytes: bytes) -> Image.Image:
+    if profile.clahe:
+        with _stage(stats, "clahe", scratch):
+            current = scratch.clahe.apply(current, scratch.get("contrast", current.shape))
+
+    # Additional denoising, into the (fresh) result array
+    denoise = profile.denoise
+    stage = "denoise" if denoise else "output"
+    with _stage(stats, stage, scratch):
+        result = np.empty_like(current)
+        if denoise is None:
+            np.copyto(result, current)
+        else:
+            run_in_strips(current, result, lambda img, dst: denoise_image(img, denoise, dst), scratch)
+        if stats is not None:
+            stats.allocated[stage] = stats.allocated.get(stage, 0) + result.nbytes
+    if stats is not None:
+        stats.strips = len(strip_bounds(current.shape))
+
+    return result
+
+def process_document_image(image_bytes: bytes, profile=None) -> Image.Image:
+    profile = get_profile(profile)
+
     # Preprocess using OpenCV
-    processed_array = preprocess_image(image_bytes)
-    
-    # Convert to PIL Image
-    pil_image = Image.fromarray(processed_array)
-    
-    # Increase resolution for better OCR
-    scale_factor = 2
-    width, height = pil_image.size
-    pil_image = pil_image.resize(
-        (width * scale_factor, height * scale_factor),
-        Image.Resampling.LANCZOS
-    )
-    
-    return pil_image
\ No newline at end of file
+    processed_array = preprocess_image(image_bytes, profile)
+    return scale_for_ocr(processed_array, profile)
+
+
+def process_gray_image(image: Image.Image, profile=None) -> Image.Image:
+    """process_document_image for an already decoded grayscale image."""
+    profile = get_profile(profile)
+    return scale_for_ocr(preprocess_array(np.asarray(image), profile), profile)
+
+
+def scale_for_ocr(processed_array: np.ndarray, profile: PreprocessProfile) -> Image.Image:
+    # Increase resolution for better OCR, only as much as the text needs
+    scale_factor = ocr_scale_factor(processed_array, profile)
+    if profile.target_text_height is None:
+        pil_image = Image.fromarray(processed_array)
+        width, height = pil_image.size
+        return pil_image.resize(
+            (int(width * scale_factor), int(height * scale_factor)),
+            Image.Resampling.LANCZOS
+        )
+
+    if scale_factor > 1.0:
+        processed_array = cv2.resize(
+            processed_array, None, fx=scale_factor, fy=scale_factor,
+            interpolation=cv2.INTER_CUBIC
+        )
+    return Image.fromarray(processed_array)
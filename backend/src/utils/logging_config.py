@@ -0,0 +1,121 @@
+# src/utils/logging_config.py
+"""
+Environment-driven logging setup.
+
+Records are put on an in-memory queue by the calling thread and formatted
+and written by a background QueueListener, so request handlers and OCR
+workers never block on log I/O. Below-WARNING records can be sampled.
+"""
+import json
+import logging
+import os
+import queue
+import random
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# "text" or "json" (one object per line)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+# Fraction of DEBUG/INFO records kept; WARNING and above are always kept
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", 1.0))
+# "1" lets clients send `X-Debug-Request: 1` to log that request's raw OCR text
+LOG_DEBUG_REQUESTS = os.getenv("LOG_DEBUG_REQUESTS", "0") == "1"
+
+# Set per request; raw OCR text and intermediate results are only logged when true
+debug_request: ContextVar[bool] = ContextVar("debug_request", default=False)
+
+_listener: Optional[QueueListener] = None
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_FIELDS})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Enqueue the record as is. The stock QueueHandler formats the message in
+    the calling thread; here that is left to the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _start_listener(handler: DeferredQueueHandler, output: logging.Handler):
+    global _listener
+    handler.queue = queue.SimpleQueue()
+    _listener = QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def logging_configured() -> bool:
+    """Whether configure_logging() installed the root handler in this process."""
+    return any(isinstance(handler, DeferredQueueHandler) for handler in logging.getLogger().handlers)
+
+
+def configure_logging():
+    """Install the queue-based root handler. Safe to call more than once."""
+    if logging_configured():
+        return
+    root = logging.getLogger()
+
+    output = logging.StreamHandler()
+    if LOG_FORMAT == "json":
+        output.setFormatter(JSONFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    handler = DeferredQueueHandler(queue.SimpleQueue())
+    if LOG_SAMPLE_RATE < 1.0:
+        handler.addFilter(SamplingFilter(LOG_SAMPLE_RATE))
+    _start_listener(handler, output)
+
+    root.handlers = [handler]
+    root.setLevel(LOG_LEVEL)
+
+    # Forked OCR pool workers do not inherit the listener thread: give each
+    # one its own queue and listener. Spawned workers start unconfigured and
+    # call configure_logging() from the pool initializer (services/ocr_pool.py)
+    os.register_at_fork(after_in_child=lambda: _start_listener(handler, output))
+
+
+def stop_logging():
+    """Flush queued records (at shutdown)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+async def debug_request_middleware(request, call_next):
+    """Sets debug_request from the X-Debug-Request header when LOG_DEBUG_REQUESTS is on."""
+    enabled = LOG_DEBUG_REQUESTS and request.headers.get("x-debug-request") == "1"
+    token = debug_request.set(enabled)
+    try:
+        return await call_next(request)
+    finally:
+        debug_request.reset(token)
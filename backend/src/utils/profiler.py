@@ -0,0 +1,91 @@
+# src/utils/profiler.py
+"""
+Minimal in-process sampling profiler.
+
+A background thread snapshots the stacks of all other threads every
+`interval` seconds and counts identical stacks in the folded format read by
+flamegraph.pl and speedscope ("thread;outer;inner 42").
+"""
+import os
+import sys
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Optional, Tuple
+
+PROFILER_INTERVAL = float(os.getenv("PROFILER_INTERVAL", 0.005))
+
+
+class SamplingProfiler:
+    def __init__(self, root: Optional[str] = None):
+        # Optional first frame of every stack, e.g. the process it was sampled in
+        self.root = root
+        self.interval = PROFILER_INTERVAL
+        self.stacks: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def active(self) -> bool:
+        return self._thread is not None
+
+    def start(self, interval: Optional[float] = None):
+        if self._thread is not None:
+            return
+        self.interval = interval or PROFILER_INTERVAL
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Dict[str, int]:
+        """Stop sampling and return (and clear) the collected stacks."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            stacks, self.stacks = dict(self.stacks), Counter()
+        return stacks
+
+    def merge(self, stacks: Dict[str, int]):
+        """Add stacks sampled elsewhere (e.g. in a pool worker)"""
+        with self._lock:
+            self.stacks.update(stacks)
+
+    def _sample(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            samples = []
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                if self.root:
+                    stack.append(self.root)
+                samples.append(";".join(reversed(stack)))
+            with self._lock:
+                self.stacks.update(samples)
+
+
+def folded(stacks: Dict[str, int]) -> str:
+    return "\n".join(f"{stack} {count}" for stack, count in sorted(stacks.items(), key=lambda item: -item[1]))
+
+
+def profile_call(fn: Callable[..., Any], interval: float, *args) -> Tuple[Any, Dict[str, int]]:
+    """Run fn(*args) under a fresh profiler; returns (result, stacks)."""
+    local = SamplingProfiler(root=f"worker-{os.getpid()}")
+    local.start(interval)
+    try:
+        result = fn(*args)
+    finally:
+        stacks = local.stop()
+    return result, stacks
+
+
+profiler = SamplingProfiler()
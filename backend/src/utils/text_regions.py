@@ -0,0 +1,57 @@
+# src/utils/text_regions.py
+import cv2
+import numpy as np
+from typing import List, Tuple
+
+Box = Tuple[int, int, int, int]  # x, y, width, height
+
+
+def find_text_lines(gray: np.ndarray, min_height: int = 8, max_height_ratio: float = 0.2) -> List[Box]:
+    """
+    Find text-line regions in a grayscale image with morphology.
+    Returns (x, y, w, h) boxes sorted top-to-bottom, left-to-right.
+    """
+    height, width = gray.shape[:2]
+
+    # Morphological gradient highlights stroke edges for dark-on-light and
+    # light-on-dark text alike
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+    gradient = cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, kernel)
+    _, binary = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+    # Join neighbouring characters into one blob per line
+    join = cv2.getStructuringElement(cv2.MORPH_RECT, (max(9, width // 60), 1))
+    connected = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, join)
+
+    contours, _ = cv2.findContours(connected, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    boxes = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if h < min_height or h > height * max_height_ratio or w < h * 1.5:
+            continue
+        # Text blobs are reasonably dense; borders and photo edges are not
+        fill = cv2.countNonZero(binary[y:y + h, x:x + w]) / float(w * h)
+        if fill < 0.1:
+            continue
+        boxes.append((x, y, w, h))
+
+    boxes.sort(key=lambda box: (box[1], box[0]))
+    return boxes
+
+
+def crop_placement(box: Box, pad_ratio: float = 0.25, min_height: int = 32) -> Tuple[int, int, int, float]:
+    """(left, top, padding, upscale factor) of the crop crop_line makes for `box`."""
+    x, y, w, h = box
+    pad = max(2, int(h * pad_ratio))
+    scale = min_height / float(h) if h < min_height else 1.0
+    return max(0, x - pad), max(0, y - pad), pad, scale
+
+
+def crop_line(gray: np.ndarray, box: Box, pad_ratio: float = 0.25, min_height: int = 32) -> np.ndarray:
+    """Crop a line box with some padding, upscaling short lines for Tesseract."""
+    x, y, w, h = box
+    left, top, pad, scale = crop_placement(box, pad_ratio, min_height)
+    crop = gray[top:y + h + pad, left:x + w + pad]
+    if scale != 1.0:
+        crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+    return crop
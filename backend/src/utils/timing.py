@@ -0,0 +1,27 @@
+# src/utils/timing.py
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+
+class StageTimer:
+    """Collects wall-clock durations (in seconds) for named pipeline stages"""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def merge(self, stages: Dict[str, float]):
+        """Add durations recorded elsewhere (e.g. in a pool worker)"""
+        for name, seconds in stages.items():
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def as_ms(self) -> Dict[str, float]:
+        return {name: round(seconds * 1000, 2) for name, seconds in self.stages.items()}
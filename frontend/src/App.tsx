@@ -21,6 +21,78 @@ interface PreviewData {
   previewUrl: string;
 }
 
+// Upload size and encoding the backend prefers (GET /api/capabilities)
+interface UploadCapabilities {
+  maxDimension: number;
+  formats: string[];
+  grayscale: boolean;
+  quality: number;
+}
+
+const API_URL = "http://localhost:8000";
+
+// Used until the backend has answered, or when it cannot be asked
+const DEFAULT_CAPABILITIES: UploadCapabilities = {
+  maxDimension: 2000,
+  formats: ["image/webp", "image/png", "image/jpeg"],
+  grayscale: true,
+  quality: 0.9,
+};
+
+const canvasToBlob = (
+  canvas: HTMLCanvasElement,
+  type: string,
+  quality: number
+) =>
+  new Promise<Blob | null>((resolve) =>
+    canvas.toBlob(resolve, type, quality)
+  );
+
+// Shrink and re-encode an image the way the backend prefers before uploading
+// it, so neither the network nor the server spends time on pixels OCR never
+// uses. Keeps the original when the browser cannot decode it or when
+// re-encoding would not make it smaller.
+const prepareUpload = async (
+  file: File,
+  capabilities: UploadCapabilities
+): Promise<Blob> => {
+  let bitmap: ImageBitmap;
+  try {
+    bitmap = await createImageBitmap(file);
+  } catch {
+    return file;
+  }
+
+  const scale = Math.min(
+    1,
+    capabilities.maxDimension / Math.max(bitmap.width, bitmap.height)
+  );
+  const canvas = document.createElement("canvas");
+  canvas.width = Math.max(1, Math.round(bitmap.width * scale));
+  canvas.height = Math.max(1, Math.round(bitmap.height * scale));
+  const ctx = canvas.getContext("2d");
+  if (!ctx) {
+    bitmap.close();
+    return file;
+  }
+  // Browsers without canvas filters upload colour; the backend converts it
+  if (capabilities.grayscale) {
+    ctx.filter = "grayscale(1)";
+  }
+  ctx.imageSmoothingQuality = "high";
+  ctx.drawImage(bitmap, 0, 0, canvas.width, canvas.height);
+  bitmap.close();
+
+  for (const type of capabilities.formats) {
+    const blob = await canvasToBlob(canvas, type, capabilities.quality);
+    // toBlob() falls back to PNG for formats the browser cannot encode
+    if (blob && blob.type === type) {
+      return scale < 1 || blob.size < file.size ? blob : file;
+    }
+  }
+  return file;
+};
+
 const DocumentCapture = () => {
   const [documentType, setDocumentType] =
     useState<DocumentData["documentType"]>("passport");
@@ -36,7 +108,22 @@ const DocumentCapture = () => {
   const [isCameraActive, setIsCameraActive] = useState(false);
   const [isInitializingCamera, setIsInitializingCamera] = useState(false);
   const [documentData, setDocumentData] = useState<DocumentData | null>(null);
+  const [capabilities, setCapabilities] =
+    useState<UploadCapabilities>(DEFAULT_CAPABILITIES);
 
+  useEffect(() => {
+    fetch(`${API_URL}/api/capabilities`)
+      .then((response) =>
+        response.ok ? response.json() : Promise.reject(response.status)
+      )
+      .then((data: UploadCapabilities) => setCapabilities(data))
+      .catch((err) =>
+        console.warn(
+          "Using default upload settings, capabilities unavailable:",
+          err
+        )
+      );
+  }, []);
 
   useEffect(() => {
     return () => {
@@ -182,12 +269,19 @@ const DocumentCapture = () => {
 
     setIsProcessing(true);
     try {
+      const upload = await prepareUpload(preview.file, capabilities);
       const formData = new FormData();
-      formData.append("file", preview.file);
+      formData.append(
+        "file",
+        upload,
+        upload === preview.file
+          ? preview.file.name
+          : `document.${upload.type.split("/")[1]}`
+      );
       formData.append("documentType", documentType);
 
       const response = await fetch(
-        "http://localhost:8000/api/process-document/",
+        `${API_URL}/api/process-document/`,
         {
           method: "POST",
           body: formData,